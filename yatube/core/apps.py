@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core import template_warmup
+        if settings.TEMPLATE_WARMUP:
+            template_warmup.warm_up()
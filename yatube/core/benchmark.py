@@ -0,0 +1,32 @@
+import subprocess
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def summarize(timings, queries):
+    """Перцентили задержки в миллисекундах и число запросов к базе"""
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'max_ms': round(max(timings, default=0) * 1000, 3),
+        'queries_p50': percentile(queries, 0.5),
+        'queries_max': max(queries, default=0),
+    }
+
+
+def get_revision():
+    """Коммит рабочей копии, чтобы сравнивать результаты между коммитами"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,259 @@
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.views.decorators.http import condition
+
+from core.instrumentation import record_cache
+from yatube.routers import primary_after_write
+
+GENERATION_KEY = 'generation.{}'
+MODIFIED_KEY = 'modified.{}'
+PAGE_KEY = 'page.{view}.{generations}.{user}.{path}'
+LATEST_PAGE_KEY = 'page.{view}.latest.{user}.{path}'
+LOCK_KEY = '{}.lock'
+WAIT_STEP = 0.05  # Пауза между проверками кеша в ожидании чужой сборки
+
+
+def get_scope_key(template, scope):
+    """Ключ области кеша по хешу её имени.
+
+    В имени бывают слаги и имена пользователей с пробелами и кириллицей,
+    а memcached принимает только короткие ASCII-ключи без пробелов.
+    """
+    return template.format(hashlib.md5(scope.encode()).hexdigest())
+
+
+def new_generation():
+    """Начальное поколение растёт со временем.
+
+    Если ключ поколения вытеснен из кеша, новое значение всё равно
+    больше старого, и страницы прошлых поколений не оживут.
+    """
+    return time.time_ns() // 1000
+
+
+def get_generations(scopes):
+    """Текущие поколения областей кеша одним запросом к кешу"""
+    keys = [get_scope_key(GENERATION_KEY, scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            value = new_generation()
+            if not cache.add(key, value, None):
+                value = cache.get(key, value)
+            found[key] = value
+    return [found[key] for key in keys]
+
+
+def bump_generation(*scopes):
+    """Сдвигает поколения: закешированные страницы областей устаревают"""
+    for scope in scopes:
+        key = get_scope_key(GENERATION_KEY, scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, new_generation(), None)
+    cache.set_many(
+        {get_scope_key(MODIFIED_KEY, scope): time.time() for scope in scopes},
+        None,
+    )
+
+
+def get_modified(scopes):
+    """Время последнего сдвига поколений областей.
+
+    Если время неизвестно (ключ вытеснен), область считается
+    изменённой сейчас: лишний полный ответ лучше ложного 304.
+    """
+    keys = [get_scope_key(MODIFIED_KEY, scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time(), None)
+            found[key] = cache.get(key, time.time())
+    return max(found.values())
+
+
+def to_last_modified(timestamp):
+    """Last-Modified с точностью до секунды.
+
+    Для изменения в текущей секунде заголовок не отдаётся: следующее
+    изменение в ту же секунду не отличить по If-Modified-Since.
+    """
+    if timestamp is None or time.time() - timestamp < 1:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def read_entry(key, stale_key, cache):
+    """Запись по ключу, а без неё — устаревшая копия прошлой сборки"""
+    entry = cache.get(key)
+    if entry is None and stale_key is not None:
+        latest_key = cache.get(stale_key)
+        if latest_key is not None and latest_key != key:
+            entry = cache.get(latest_key)
+            if entry is not None:
+                entry = (entry[0], 0)
+    return entry
+
+
+def wait_for_entry(key, cache):
+    """Ждёт, пока значение соберёт процесс, взявший блокировку"""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def acquire_lock(key, cache):
+    """Блокировка пересборки.
+
+    cache.add атомарен в locmem, memcached и redis, а у файлового
+    бэкенда это проверка и запись, поэтому для него блокировкой служит
+    файл, созданный с O_EXCL.
+    """
+    lock_key = LOCK_KEY.format(key)
+    if not isinstance(cache, FileBasedCache):
+        return cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT)
+    path = cache._key_to_file(lock_key)
+    try:
+        if time.time() - os.path.getmtime(path) > settings.CACHE_LOCK_TIMEOUT:
+            os.remove(path)
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def release_lock(key, cache):
+    lock_key = LOCK_KEY.format(key)
+    if not isinstance(cache, FileBasedCache):
+        cache.delete(lock_key)
+        return
+    try:
+        os.remove(cache._key_to_file(lock_key))
+    except FileNotFoundError:
+        pass
+
+
+def get_or_build(key, build, timeout, stale_key=None, cacheable=None,
+                 cache=cache, name='value'):
+    """Значение из кеша с защитой от лавины пересборок.
+
+    Запись хранит время свежести и живёт ещё CACHE_STALE_TTL после него.
+    Пересобирает значение только тот, кто взял блокировку через
+    cache.add, остальные отдают устаревшую копию, а если её нет — ждут
+    готового значения не дольше CACHE_LOCK_WAIT. stale_key указывает
+    на ключ последней сборки: так после смены ключа (например, поколения)
+    можно отдать прошлую копию, пока собирается новая. name — имя кеша
+    в счётчиках попаданий.
+    """
+    entry = read_entry(key, stale_key, cache)
+    if entry is not None and entry[1] > time.time():
+        record_cache(name, True)
+        return entry[0]
+    if acquire_lock(key, cache):
+        record_cache(name, False)
+        try:
+            value = build()
+            if cacheable is None or cacheable(value):
+                expires = timeout + settings.CACHE_STALE_TTL
+                cache.set(key, (value, time.time() + timeout), expires)
+                if stale_key is not None:
+                    cache.set(stale_key, key, expires)
+            return value
+        finally:
+            release_lock(key, cache)
+    entry = entry or wait_for_entry(key, cache)
+    record_cache(name, entry is not None)
+    return build() if entry is None else entry[0]
+
+
+def condition_versioned(get_scopes):
+    """Условный GET по поколениям областей кеша страницы.
+
+    ETag складывается из поколений и пользователя, Last-Modified — из
+    времени их сдвига, поэтому ответ 304 обходится без запросов к базе
+    и рендеринга.
+    """
+    def etag(request, *args, **kwargs):
+        generations = get_generations(get_scopes(request, *args, **kwargs))
+        return '-'.join(map(str, [*generations, request.user.pk or 0]))
+
+    def last_modified(request, *args, **kwargs):
+        return to_last_modified(
+            get_modified(get_scopes(request, *args, **kwargs))
+        )
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def get_page_key(view, scopes, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(
+        view=view,
+        generations='.'.join(map(str, get_generations(scopes))),
+        user=request.user.pk or 0,
+        path=path,
+    ), LATEST_PAGE_KEY.format(
+        view=view, user=request.user.pk or 0, path=path
+    )
+
+
+def is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def cache_page_versioned(get_scopes, timeout=None):
+    """Кеширует страницу до смены поколения её областей.
+
+    get_scopes получает аргументы представления и возвращает области
+    кеша, например ('index',) или (f'group:{slug}',). Ключ страницы
+    включает поколения областей и пользователя, поэтому запись в одну
+    область не вытесняет страницы других. Пока после смены поколения
+    страница пересобирается, остальные запросы получают прошлую копию.
+    """
+    if timeout is None:
+        timeout = settings.PAGE_CACHE_TIMEOUT
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            scopes = get_scopes(request, *args, **kwargs)
+            key, stale_key = get_page_key(view.__name__, scopes, request)
+
+            def build():
+                # Страница живёт до смены поколения, поэтому сразу после
+                # изменения её областей она собирается по основной базе
+                with primary_after_write(get_modified(scopes)):
+                    return view(request, *args, **kwargs)
+
+            return get_or_build(
+                key,
+                build,
+                timeout,
+                stale_key=stale_key,
+                cacheable=is_cacheable,
+                name='page',
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from core import metrics, slow_queries
+
+logger = logging.getLogger('yatube.requests')
+
+
+class RequestStats:
+    """Счётчики одного запроса: база, шаблоны и кеш"""
+    def __init__(self, request=None):
+        self.request = request
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.templates = []  # Стек шаблонов, которые сейчас рендерятся
+        self.explaining = False
+        self.cache = Counter()  # (кеш, попадание) → число обращений
+
+    @property
+    def cache_hits(self):
+        return sum(
+            count for (name, hit), count in self.cache.items() if hit
+        )
+
+    @property
+    def cache_misses(self):
+        return sum(
+            count for (name, hit), count in self.cache.items() if not hit
+        )
+
+    def as_dict(self, total):
+        return {
+            'view': self.view,
+            'total_ms': round(total * 1000, 2),
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+    def server_timing(self, total):
+        """Значение заголовка Server-Timing.
+
+        Запросы из шаблонов входят и в db, и в tpl, поэтому сумма
+        метрик может быть больше total.
+        """
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.2f}',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+            f'view;desc="{self.view or "-"}"',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+
+class State(threading.local):
+    stats = None
+
+
+state = State()
+
+
+def record_cache(name, hit):
+    """Учитывает обращение к кешу name в текущем запросе"""
+    stats = state.stats
+    if stats is not None:
+        stats.cache[name, hit] += 1
+
+
+def time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats = state.stats
+        if stats is not None and not stats.explaining:
+            duration = time.perf_counter() - started
+            stats.queries += 1
+            stats.db_time += duration
+            slow_queries.check(sql, params, many, context, duration, stats)
+
+
+class TimedTemplate(Template):
+    """Шаблон бэкенда с замером времени рендеринга.
+
+    Время внешнего шаблона учитывается один раз, даже если он
+    рендерит другие через бэкенд. Имя шаблона попадает в стек
+    шаблонов для журнала медленных запросов.
+    """
+    def render(self, context=None, request=None):
+        stats = state.stats
+        if stats is None:
+            return super().render(context, request)
+        stats.templates.append(self.origin.template_name or self.origin.name)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.templates.pop()
+            if not stats.templates:
+                stats.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, который отдаёт шаблоны с замером времени"""
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else None
+
+
+def show_server_timing(request):
+    """Server-Timing при DEBUG, с INTERNAL_IPS и для сотрудников.
+
+    SERVER_TIMING_PUBLIC отдаёт заголовок всем.
+    """
+    if settings.SERVER_TIMING_PUBLIC or settings.DEBUG:
+        return True
+    if request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class ServerTimingMiddleware:
+    """Число и время запросов к базе, время шаблонов и обращения к кешу.
+
+    Отдаёт их в заголовке Server-Timing (только своим, см.
+    show_server_timing) и строкой лога yatube.requests вместе с именем
+    представления и добавляет в метрики /metrics.
+    Запросы дольше SLOW_QUERY_THRESHOLD попадают в журнал медленных
+    запросов (core/slow_queries.py).
+    У потоковых ответов учитывается только то, что выполнено до начала
+    отдачи.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = state.stats = RequestStats(request)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(time_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            state.stats = None
+        total = time.perf_counter() - started
+        stats.view = get_view_name(request)
+        if show_server_timing(request):
+            response['Server-Timing'] = stats.server_timing(total)
+        metrics.record_request(stats, response.status_code, total)
+        if not logger.isEnabledFor(logging.INFO):
+            return response
+        values = stats.as_dict(total)
+        logger.info(
+            'method=%s path=%s status=%s %s',
+            request.method,
+            request.path,
+            response.status_code,
+            ' '.join(f'{name}={value}' for name, value in values.items()),
+            extra={'request_stats': values},
+        )
+        return response
@@ -0,0 +1,72 @@
+import glob
+import os
+import pstats
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiler import COLLAPSED_SUFFIX, PSTATS_SUFFIX
+
+
+class Command(BaseCommand):
+    help = (
+        'Складывает профили медленных запросов: стеки в формат '
+        'flamegraph.pl и speedscope, pstats — в один файл'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view', help='Имя представления, например posts:post_detail'
+        )
+        parser.add_argument(
+            '--dir', help='Каталог профилей, по умолчанию PROFILER_DIR'
+        )
+        parser.add_argument(
+            '--format', choices=('collapsed', 'pstats'), default='collapsed'
+        )
+        parser.add_argument(
+            '--output', help='Файл результата, для collapsed — stdout'
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько функций pstats показать',
+        )
+
+    def get_files(self, options, suffix):
+        directory = options['dir'] or settings.PROFILER_DIR
+        view = (options['view'] or '*').replace(':', '.')
+        return sorted(glob.glob(os.path.join(directory, view, '*' + suffix)))
+
+    def collapsed(self, files, options):
+        stacks = Counter()
+        for path in files:
+            with open(path, encoding='utf-8') as dump_file:
+                for line in dump_file:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        stacks[stack] += int(count)
+        lines = [f'{stack} {count}\n' for stack, count in
+                 stacks.most_common()]
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+    def pstats(self, files, options):
+        stats = pstats.Stats(*files, stream=self.stdout)
+        if options['output']:
+            stats.dump_stats(options['output'])
+        stats.sort_stats('cumulative').print_stats(options['top'])
+
+    def handle(self, *args, **options):
+        suffix = {
+            'collapsed': COLLAPSED_SUFFIX, 'pstats': PSTATS_SUFFIX
+        }[options['format']]
+        files = self.get_files(options, suffix)
+        if not files:
+            raise CommandError('Профили не найдены')
+        getattr(self, options['format'])(files, options)
+        self.stderr.write(f'Профилей: {len(files)}')
@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmark import percentile
+from yatube.db import apply_pragmas
+
+ROWS = 1000  # Строк в таблице до начала замера
+
+
+class Worker(threading.Thread):
+    """Поток с собственным соединением, работающий до сигнала stop.
+
+    Замер начинается, когда все потоки подключились (барьер ready).
+    """
+    def __init__(self, path, pragmas, ready, stop, action):
+        super().__init__(daemon=True)
+        self.path = path
+        self.pragmas = pragmas
+        self.ready = ready
+        self.stop = stop
+        self.action = action
+        self.timings = []
+        self.errors = 0
+
+    def run(self):
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        apply_pragmas(connection, self.pragmas)
+        self.ready.wait()
+        try:
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                try:
+                    self.action(connection)
+                except sqlite3.OperationalError:
+                    # database is locked дольше busy_timeout
+                    self.errors += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    continue
+                self.timings.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержки чтения SQLite под конкурентной записью '
+        'в режиме журнала отката и с настройками SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=3.0,
+            help='Длительность замера каждого режима, секунды',
+        )
+        parser.add_argument(
+            '--hold', type=float, default=0.02,
+            help='Сколько секунд писатель держит транзакцию открытой',
+        )
+
+    def prepare(self, path, pragmas):
+        """Заполняет таблицу и возвращает режим журнала базы"""
+        connection = sqlite3.connect(path, isolation_level=None)
+        apply_pragmas(connection, pragmas)
+        journal_mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT)'
+        )
+        connection.executemany(
+            'INSERT INTO post (text) VALUES (?)',
+            [(f'Пост {i}',) for i in range(ROWS)],
+        )
+        connection.close()
+        return journal_mode
+
+    def measure(self, pragmas, options):
+        hold = options['hold']
+
+        def write(connection):
+            # EXCLUSIVE моделирует фазу записи страниц в файл базы:
+            # в журнале отката она закрывает базу для чтения, в WAL — нет
+            connection.execute('BEGIN EXCLUSIVE')
+            connection.execute(
+                'INSERT INTO post (text) VALUES (?)', ('Новый пост',)
+            )
+            time.sleep(hold)
+            connection.execute('COMMIT')
+
+        def read(connection):
+            connection.execute(
+                'SELECT id, text FROM post ORDER BY id DESC LIMIT 10'
+            ).fetchall()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.sqlite3')
+            journal_mode = self.prepare(path, pragmas)
+            ready = threading.Barrier(
+                options['readers'] + options['writers'] + 1
+            )
+            stop = threading.Event()
+            writers = [
+                Worker(path, pragmas, ready, stop, write)
+                for _ in range(options['writers'])
+            ]
+            readers = [
+                Worker(path, pragmas, ready, stop, read)
+                for _ in range(options['readers'])
+            ]
+            for worker in writers + readers:
+                worker.start()
+            ready.wait()
+            time.sleep(options['duration'])
+            stop.set()
+            for worker in writers + readers:
+                worker.join()
+        timings = [value for worker in readers for value in worker.timings]
+        return {
+            'journal_mode': journal_mode,
+            'reads': len(timings),
+            'read_errors': sum(worker.errors for worker in readers),
+            'writes': sum(len(worker.timings) for worker in writers),
+            'write_errors': sum(worker.errors for worker in writers),
+            'read_p50_ms': percentile(timings, 0.5) * 1000,
+            'read_p99_ms': percentile(timings, 0.99) * 1000,
+            'read_max_ms': max(timings, default=0) * 1000,
+        }
+
+    def handle(self, *args, **options):
+        # Режимы отличаются только журналом: ожидание блокировки
+        # по busy_timeout попадает в задержку чтения
+        modes = {
+            'journal_mode=delete': dict(
+                settings.SQLITE_PRAGMAS, journal_mode='delete'
+            ),
+            'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+        self.results = {}
+        for name, pragmas in modes.items():
+            result = self.results[name] = self.measure(pragmas, options)
+            self.stdout.write(
+                f'{name}: чтений {result["reads"]} '
+                f'(заблокировано {result["read_errors"]}), '
+                f'записей {result["writes"]}, '
+                f'p50 {result["read_p50_ms"]:.2f} мс, '
+                f'p99 {result["read_p99_ms"]:.2f} мс, '
+                f'max {result["read_max_ms"]:.2f} мс'
+            )
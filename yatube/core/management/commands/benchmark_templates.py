@@ -0,0 +1,79 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+
+from core.benchmark import percentile
+from core.template_warmup import get_template_names, warm_up
+
+
+def make_engine():
+    """Новый движок с кеширующим загрузчиком и пустым кешем"""
+    params = {
+        key: value for key, value in settings.TEMPLATES[0].items()
+        if key != 'BACKEND'
+    }
+    params.update(NAME='benchmark', APP_DIRS=False)
+    params['OPTIONS'] = dict(params['OPTIONS'], loaders=[
+        ('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS),
+    ])
+    return DjangoTemplates(params).engine
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает первое обращение к шаблонам без прогрева и после него '
+        'и замеряет время прогрева при старте воркера'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторить замер на новых движках',
+        )
+        parser.add_argument('--output', help='Файл JSON с результатами')
+
+    def get_timings(self, engine, names):
+        timings = []
+        for name in names:
+            started = time.perf_counter()
+            engine.get_template(name)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def summarize(self, timings):
+        return {
+            'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'total_ms': round(sum(timings) * 1000, 3),
+        }
+
+    def handle(self, *args, **options):
+        names = get_template_names(make_engine())
+        cold, warm, warmups = [], [], []
+        for _ in range(options['repeat']):
+            cold += self.get_timings(make_engine(), names)
+            engine = self.engine = make_engine()  # Последний прогретый
+            warmups.append(warm_up(engine)[1])
+            warm += self.get_timings(engine, names)
+        self.results = {
+            'templates': len(names),
+            'warmup_ms': round(percentile(warmups, 0.5) * 1000, 3),
+            'cold': self.summarize(cold),
+            'warm': self.summarize(warm),
+        }
+        self.stdout.write(
+            f'Шаблонов: {len(names)}, прогрев при старте '
+            f'{self.results["warmup_ms"]:.2f} мс'
+        )
+        for name in ('cold', 'warm'):
+            result = self.results[name]
+            self.stdout.write(
+                f'{name}: p50 {result["p50_ms"]:.3f} мс, '
+                f'p99 {result["p99_ms"]:.3f} мс на шаблон'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(self.results, output, indent=2)
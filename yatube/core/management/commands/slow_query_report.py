@@ -0,0 +1,94 @@
+import glob
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import percentile
+from core.slow_queries import normalize
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов по отпечаткам: сколько раз, '
+        'сколько времени, из каких представлений и с каким планом'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', help='Файл журнала, по умолчанию SLOW_QUERY_LOG'
+        )
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести сводку в JSON'
+        )
+
+    def read_entries(self, path):
+        """Строки журнала вместе с ротированными файлами path.1, path.2…"""
+        paths = glob.glob(glob.escape(path) + '.*') + glob.glob(
+            glob.escape(path)
+        )
+        for log_path in paths:
+            with open(log_path, encoding='utf-8') as log_file:
+                for line in log_file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def group(self, entries):
+        groups = {}
+        for entry in entries:
+            group = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'],
+                'sql': normalize(entry['sql']),
+                'durations': [],
+                'views': {},
+                'templates': {},
+                'plan': entry['plan'],
+                'last_seen': 0,
+            })
+            group['durations'].append(entry['duration_ms'])
+            for field in ('view', 'template'):
+                name = entry[field] or '-'
+                counts = group[field + 's']
+                counts[name] = counts.get(name, 0) + 1
+            if entry['time'] >= group['last_seen']:
+                group['last_seen'] = entry['time']
+                group['plan'] = entry['plan']
+        report = []
+        for group in groups.values():
+            durations = group.pop('durations')
+            report.append(dict(
+                group,
+                count=len(durations),
+                total_ms=round(sum(durations), 3),
+                p50_ms=percentile(durations, 0.5),
+                max_ms=max(durations),
+            ))
+        return sorted(report, key=lambda item: item['total_ms'], reverse=True)
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        report = self.group(self.read_entries(path))[:options['top']]
+        if not report:
+            raise CommandError(f'В журнале {path} нет медленных запросов')
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for item in report:
+            self.stdout.write(
+                f'{item["fingerprint"]}: {item["count"]} раз, '
+                f'всего {item["total_ms"]:.1f} мс, '
+                f'p50 {item["p50_ms"]:.1f} мс, max {item["max_ms"]:.1f} мс'
+            )
+            self.stdout.write(f'  {item["sql"]}')
+            self.stdout.write('  Представления: ' + ', '.join(
+                f'{name} ({count})' for name, count in item['views'].items()
+            ))
+            self.stdout.write('  Шаблоны: ' + ', '.join(
+                f'{name} ({count})'
+                for name, count in item['templates'].items()
+            ))
+            for row in item['plan'] or ():
+                self.stdout.write(f'  {row}')
@@ -0,0 +1,203 @@
+import atexit
+import glob
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Метрика: (тип, описание)
+METRICS = {
+    'yatube_requests_total': ('counter', 'Запросы по представлениям'),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время ответа представлений'
+    ),
+    'yatube_db_queries_total': ('counter', 'Запросы к базе по представлениям'),
+    'yatube_db_duration_seconds_total': (
+        'counter', 'Время запросов к базе по представлениям'
+    ),
+    'yatube_cache_requests_total': (
+        'counter', 'Обращения к кешу страниц и фрагментов'
+    ),
+    'yatube_cache_hit_ratio': ('gauge', 'Доля попаданий в кеш'),
+    'yatube_thumbnail_duration_seconds': (
+        'histogram', 'Время построения вариантов картинки'
+    ),
+}
+
+
+class Registry:
+    """Значения метрик процесса: (имя, метки) → число.
+
+    Гистограмма хранится готовыми сериями _bucket, _sum и _count, поэтому
+    значения разных процессов складываются поэлементно. Если задан
+    METRICS_DIR, процесс раз в METRICS_FLUSH_INTERVAL секунд записывает
+    свои значения в собственный файл, а /metrics складывает все файлы:
+    процессы не делят ни файлов, ни блокировок.
+    """
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+        self.flushed = 0.0
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, tuple(labels))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.maybe_flush()
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        labels = tuple(labels)
+        with self.lock:
+            for bound in buckets + ('+Inf',):
+                key = (f'{name}_bucket', labels + (('le', str(bound)),))
+                self.values[key] = self.values.get(key, 0) + (
+                    bound == '+Inf' or value <= bound
+                )
+            for suffix, amount in (('_sum', value), ('_count', 1)):
+                key = (name + suffix, labels)
+                self.values[key] = self.values.get(key, 0) + amount
+        self.maybe_flush()
+
+    def get_path(self):
+        return os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+
+    def maybe_flush(self):
+        if not settings.METRICS_DIR:
+            return
+        if time.monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Атомарно переписывает файл процесса"""
+        if not settings.METRICS_DIR:
+            return
+        with self.lock:
+            self.flushed = time.monotonic()
+            rows = [[name, labels, value]
+                    for (name, labels), value in self.values.items()]
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=settings.METRICS_DIR)
+        with os.fdopen(descriptor, 'w') as metrics_file:
+            json.dump(rows, metrics_file)
+        os.replace(path, self.get_path())
+
+    def collect(self):
+        """Сумма значений всех процессов"""
+        if not settings.METRICS_DIR:
+            with self.lock:
+                return dict(self.values)
+        self.flush()
+        values = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            try:
+                with open(path) as metrics_file:
+                    rows = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                key = (name, tuple(map(tuple, labels)))
+                values[key] = values.get(key, 0) + value
+        return values
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def record_request(stats, status, duration):
+    """Метрики запроса по счётчикам core.instrumentation"""
+    view = (('view', stats.view or '-'),)
+    registry.inc('yatube_requests_total', view + (('status', str(status)),))
+    registry.observe('yatube_request_duration_seconds', duration, view)
+    registry.inc('yatube_db_queries_total', view, stats.queries)
+    registry.inc('yatube_db_duration_seconds_total', view, stats.db_time)
+    for (name, hit), count in stats.cache.items():
+        registry.inc(
+            'yatube_cache_requests_total',
+            (('cache', name), ('result', 'hit' if hit else 'miss')),
+            count,
+        )
+
+
+def add_hit_ratios(values):
+    totals = {}
+    for (name, labels), value in values.items():
+        if name == 'yatube_cache_requests_total':
+            labels = dict(labels)
+            hits, total = totals.get(labels['cache'], (0, 0))
+            if labels['result'] == 'hit':
+                hits += value
+            totals[labels['cache']] = (hits, total + value)
+    for cache_name, (hits, total) in totals.items():
+        values['yatube_cache_hit_ratio', (('cache', cache_name),)] = (
+            hits / total
+        )
+
+
+def escape(value):
+    return (
+        value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+
+
+def get_base_name(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return name
+
+
+def render(values):
+    """Текстовый формат экспозиции Prometheus"""
+    lines = []
+    described = set()
+    # Сортировка устойчива: корзины гистограммы остаются по возрастанию
+    for (name, labels), value in sorted(
+        values.items(), key=lambda item: get_base_name(item[0][0])
+    ):
+        base = get_base_name(name)
+        if base not in described and base in METRICS:
+            described.add(base)
+            kind, description = METRICS[base]
+            lines.append(f'# HELP {base} {description}')
+            lines.append(f'# TYPE {base} {kind}')
+        label_text = ','.join(
+            f'{key}="{escape(str(label))}"' for key, label in labels
+        )
+        lines.append(
+            f'{name}{{{label_text}}} {value}' if labels
+            else f'{name} {value}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def is_allowed(request):
+    """Адрес из METRICS_ALLOWED_IPS или заголовок Bearer с METRICS_TOKEN"""
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(
+        header.encode(), f'Bearer {token}'.encode()
+    )
+
+
+@require_GET
+def metrics(request):
+    """Метрики всех процессов для Prometheus.
+
+    Остальным адрес не виден: ответ 404.
+    """
+    if not is_allowed(request):
+        raise Http404
+    values = registry.collect()
+    add_hit_ratios(values)
+    return HttpResponse(render(values), content_type=CONTENT_TYPE)
@@ -0,0 +1,134 @@
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+from core.instrumentation import get_view_name
+
+COLLAPSED_SUFFIX = '.collapsed'
+PSTATS_SUFFIX = '.pstats'
+
+
+def get_frame_name(frame):
+    return f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_name}'
+
+
+def collapse(frame):
+    """Стек от корня к листу в формате flamegraph: a;b;c"""
+    names = []
+    while frame is not None:
+        names.append(get_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler(threading.Thread):
+    """Снимает стек потока запроса раз в PROFILER_INTERVAL секунд.
+
+    Сам запрос не замедляется трассировкой: стоимость — фоновый поток,
+    который просыпается между снимками.
+    """
+    suffix = COLLAPSED_SUFFIX
+
+    def __init__(self):
+        super().__init__(daemon=True, name='profiler')
+        self.thread_id = threading.get_ident()
+        self.interval = settings.PROFILER_INTERVAL
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            for stack, count in self.stacks.most_common():
+                dump_file.write(f'{stack} {count}\n')
+
+
+class DeterministicProfiler:
+    """cProfile: точные времена функций, но без полных стеков"""
+    suffix = PSTATS_SUFFIX
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+PROFILERS = {
+    'sampling': SamplingProfiler,
+    'cprofile': DeterministicProfiler,
+}
+
+
+def get_dump_path(view_name):
+    """Файл в каталоге представления: PROFILER_DIR/posts.post_detail/…"""
+    directory = os.path.join(
+        settings.PROFILER_DIR, re.sub(r'[^\w.-]', '.', view_name or '-')
+    )
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{time.time_ns()}-{os.getpid()}')
+
+
+class ProfilerMiddleware:
+    """Профилирует долю запросов и сохраняет профили медленных.
+
+    Включается PROFILER_SAMPLE_RATE > 0. Профиль запроса дольше
+    PROFILER_THRESHOLD секунд записывается в PROFILER_DIR по имени
+    представления, остальные отбрасываются. PROFILER_VIEWS ограничивает
+    профилирование списком представлений.
+    """
+    def __init__(self, get_response):
+        if not settings.PROFILER_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def is_profiled(self, request):
+        if random.random() >= settings.PROFILER_SAMPLE_RATE:
+            return False
+        if not settings.PROFILER_VIEWS:
+            return True
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return False
+        return view_name in settings.PROFILER_VIEWS
+
+    def __call__(self, request):
+        if not self.is_profiled(request):
+            return self.get_response(request)
+        profiler = PROFILERS[settings.PROFILER_MODE]()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        if time.perf_counter() - started >= settings.PROFILER_THRESHOLD:
+            profiler.dump(
+                get_dump_path(get_view_name(request)) + profiler.suffix
+            )
+        return response
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger('yatube.slow_queries')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDERS_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Текст запроса без значений.
+
+    Литералы и параметры заменены на ?, а списки IN (?, ?, …) любой
+    длины сведены к IN (...), чтобы запросы группировались по форме.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDERS_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:12]
+
+
+def get_shape(params, many):
+    """Типы параметров без значений: в журнал не попадают данные"""
+    if many:
+        params = list(params or ())
+        first = params[0] if params else ()
+        return {'rows': len(params), 'types': get_shape(first, False)}
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def explain(connection, sql, params):
+    """План запроса, ошибка плана не мешает основному запросу"""
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    if connection.vendor == 'sqlite':
+        # id, parent, notused, detail — для чтения нужен только detail
+        return [row[-1] for row in rows]
+    return [' '.join(map(str, row)) for row in rows]
+
+
+def check(sql, params, many, context, duration, stats):
+    """Пишет запрос дольше SLOW_QUERY_THRESHOLD в журнал yatube.slow_queries.
+
+    Строка журнала — JSON с текстом, отпечатком, формой параметров,
+    представлением, шаблоном и планом запроса.
+    """
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if threshold is None or duration < threshold:
+        return
+    connection = context['connection']
+    plan = None
+    if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        stats.explaining = True
+        try:
+            plan = explain(connection, sql, params)
+        finally:
+            stats.explaining = False
+    match = getattr(stats.request, 'resolver_match', None)
+    logger.warning(json.dumps(
+        {
+            'time': time.time(),
+            'duration_ms': round(duration * 1000, 3),
+            'fingerprint': fingerprint(sql),
+            'sql': sql,
+            'params': get_shape(params, many),
+            'database': connection.alias,
+            'view': match.view_name if match is not None else None,
+            'template': stats.templates[-1] if stats.templates else None,
+            'plan': plan,
+        },
+        ensure_ascii=False,
+    ))
@@ -0,0 +1,54 @@
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_dirs(engine):
+    """Каталоги шаблонов проекта: DIRS и templates/ приложений проекта.
+
+    Шаблоны сторонних приложений (например, админки) не прогреваются:
+    их большинство воркеру никогда не понадобится.
+    """
+    app_dirs = [
+        directory for directory in get_app_template_dirs('templates')
+        if str(directory).startswith(settings.BASE_DIR)
+    ]
+    return list(engine.dirs) + app_dirs
+
+
+def get_template_names(engine):
+    names = []
+    for template_dir in get_template_dirs(engine):
+        for root, _, files in os.walk(template_dir):
+            for filename in sorted(files):
+                if filename.endswith(TEMPLATE_SUFFIXES):
+                    names.append(os.path.relpath(
+                        os.path.join(root, filename), template_dir
+                    ).replace(os.sep, '/'))
+    return sorted(set(names))
+
+
+def warm_up(engine=None):
+    """Разбирает все шаблоны проекта, чтобы их сохранил кеширующий загрузчик.
+
+    Первый запрос воркера после этого не читает файлы шаблонов и не
+    разбирает их. Возвращает число шаблонов и время в секундах.
+    """
+    if engine is None:
+        engine = engines['django'].engine
+    started = time.perf_counter()
+    names = get_template_names(engine)
+    for name in names:
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception('Шаблон %s не разобран при прогреве', name)
+    return len(names), time.perf_counter() - started
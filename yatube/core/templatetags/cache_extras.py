@@ -0,0 +1,51 @@
+from django import template
+from django.conf import settings
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import get_or_build
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = make_template_fragment_key(
+            self.fragment_name, [var.resolve(context) for var in self.vary_on]
+        )
+        if self.timeout is None:
+            timeout = settings.FRAGMENT_CACHE_TIMEOUT
+        else:
+            timeout = self.timeout.resolve(context)
+        return get_or_build(
+            key, lambda: self.nodelist.render(context),
+            timeout,
+            name='fragment',
+        )
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """Кеш фрагмента с защитой от лавины пересборок.
+
+    {% fragment_cache timeout name [vary_on ...] %} ... {% endfragment_cache %}
+    Вместо timeout можно указать default — FRAGMENT_CACHE_TIMEOUT.
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]} принимает как минимум два аргумента'
+        )
+    return FragmentCacheNode(
+        nodelist,
+        None if tokens[1] == 'default' else parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from core.cache import (
+    acquire_lock, bump_generation, get_generations, get_modified, get_or_build,
+    release_lock,
+)
+
+
+class GetOrBuildTest(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.backends = [
+            LocMemCache('stampede', {}),
+            FileBasedCache(self.cache_dir, {}),
+        ]
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def slow_build(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return 'страница'
+
+    def test_single_flight_on_cold_key(self):
+        """Холодный ключ собирает только один поток"""
+        for backend in self.backends:
+            with self.subTest(backend=type(backend).__name__):
+                self.calls = 0
+                results = []
+                threads = [
+                    threading.Thread(target=lambda: results.append(
+                        get_or_build('feed', self.slow_build, 60,
+                                     cache=backend)
+                    ))
+                    for _ in range(8)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertEqual(self.calls, 1)
+                self.assertEqual(results, ['страница'] * 8)
+
+    def test_stale_copy_served_while_rebuilding(self):
+        """Пока идёт пересборка, отдаётся устаревшая копия"""
+        for backend in self.backends:
+            with self.subTest(backend=type(backend).__name__):
+                self.calls = 0
+                backend.set('feed', ('старая', time.time() - 1), 60)
+                self.assertTrue(acquire_lock('feed', backend))
+                value = get_or_build(
+                    'feed', self.slow_build, 60, cache=backend
+                )
+                self.assertEqual(value, 'старая')
+                self.assertEqual(self.calls, 0)
+                release_lock('feed', backend)
+                value = get_or_build(
+                    'feed', self.slow_build, 60, cache=backend
+                )
+                self.assertEqual(value, 'страница')
+
+    def test_stale_key_points_to_previous_version(self):
+        """После смены ключа отдаётся копия прошлой версии"""
+        backend = self.backends[0]
+        get_or_build('feed.v1', lambda: 'v1', 60, 'feed.latest', cache=backend)
+        acquire_lock('feed.v2', backend)
+        self.assertEqual(
+            get_or_build(
+                'feed.v2', self.slow_build, 60, 'feed.latest', cache=backend
+            ),
+            'v1'
+        )
+
+    def test_fragment_cache_tag(self):
+        """Тег fragment_cache кеширует фрагмент шаблона"""
+        cache.clear()
+        template = Template(
+            '{% load cache_extras %}'
+            '{% fragment_cache 60 card post %}{{ text }}'
+            '{% endfragment_cache %}'
+        )
+        first = template.render(Context({'post': 1, 'text': 'старый'}))
+        second = template.render(Context({'post': 1, 'text': 'новый'}))
+        other = template.render(Context({'post': 2, 'text': 'новый'}))
+        self.assertEqual(first, 'старый')
+        self.assertEqual(second, 'старый')
+        self.assertEqual(other, 'новый')
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_fragment_cache_default_timeout(self):
+        """default в теге fragment_cache — таймаут FRAGMENT_CACHE_TIMEOUT"""
+        cache.clear()
+        template = Template(
+            '{% load cache_extras %}'
+            '{% fragment_cache default card post %}{{ text }}'
+            '{% endfragment_cache %}'
+        )
+        template.render(Context({'post': 1, 'text': 'старый'}))
+        second = template.render(Context({'post': 1, 'text': 'новый'}))
+        self.assertEqual(second, 'новый')
+
+
+class GenerationKeyTest(TestCase):
+    def test_scope_keys_are_memcached_safe(self):
+        """Ключи областей со слагом на кириллице годятся для memcached"""
+        scope = 'group:Тестовый слаг'
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            bump_generation(scope)
+            get_generations([scope])
+            get_modified([scope])
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import (
+    Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from core.management.commands.benchmark_sqlite import Command
+from posts.importer import import_rows
+from posts.models import Post, User
+from yatube.db import apply_pragmas
+from yatube.routers import PIN_COOKIE, PrimaryReplicaRouter, state
+
+
+class SqlitePragmasTest(TestCase):
+    def test_connection_is_configured(self):
+        """Соединение Django получает настройки из SQLITE_PRAGMAS"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_file_database_switches_to_wal(self):
+        """Файловая база переходит в WAL, None пропускает PRAGMA"""
+        with tempfile.TemporaryDirectory() as directory:
+            database = sqlite3.connect(os.path.join(directory, 'db.sqlite3'))
+            apply_pragmas(
+                database, dict(settings.SQLITE_PRAGMAS, cache_size=None)
+            )
+            self.assertEqual(
+                database.execute('PRAGMA journal_mode').fetchone()[0], 'wal'
+            )
+            self.assertEqual(
+                database.execute('PRAGMA cache_size').fetchone()[0], -2000
+            )
+            database.close()
+
+
+class SqliteBenchmarkTest(SimpleTestCase):
+    def test_benchmark_measures_both_modes(self):
+        """Замер проходит в обоих режимах журнала и возвращает задержки"""
+        command = Command()
+        call_command(
+            command, readers=2, writers=1, duration=0.2, hold=0.01,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            {name: result['journal_mode']
+             for name, result in command.results.items()},
+            {'journal_mode=delete': 'delete', 'SQLITE_PRAGMAS': 'wal'},
+        )
+        for result in command.results.values():
+            self.assertGreater(result['reads'], 0)
+            self.assertGreater(result['writes'], 0)
+            for key in ('read_p50_ms', 'read_p99_ms', 'read_max_ms'):
+                self.assertGreater(result[key], 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(TransactionTestCase):
+    """Основная база и реплика в отдельном файле SQLite.
+
+    Реплика догоняет основную базу только при вызове replicate(),
+    поэтому видно, из какой базы прочитана страница.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        connections.ensure_defaults('replica')
+        connections.prepare_test_settings('replica')
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        delattr(connections._connections, 'replica')
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def replicate(self):
+        for alias in ('default', 'replica'):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(
+            connections['replica'].connection
+        )
+
+    def setUp(self):
+        self.replicate()
+        self.author = User.objects.create_user(username='replica_author')
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_reads_go_to_replica(self):
+        """Чтения постов идут на реплику, пользователи — в основную базу"""
+        router = PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))  # Вне запроса
+        state.pinned = False
+        try:
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertIsNone(router.db_for_read(User))
+        finally:
+            state.pinned = True
+        self.assertEqual(router.db_for_write(Post), 'default')
+        Post.objects.create(text='Пост на основной базе', author=self.author)
+        cache.clear()
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'Пост на основной базе')
+        self.replicate()
+        cache.clear()
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост на основной базе')
+
+    def test_writer_is_pinned_to_primary(self):
+        """После записи автор читает с основной базы и видит свой пост"""
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}
+        )
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]['max-age'],
+            settings.REPLICA_PIN_SECONDS,
+        )
+        post = Post.objects.using('default').get(text='Свежий пост')
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        self.assertEqual(
+            self.guest_client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+
+    def test_commands_read_from_primary(self):
+        """Импорт вне запроса сразу читает то, что записал"""
+        row = {'text': 'Импорт', 'author': 'replica_author', 'group': 'new'}
+        import_rows('posts', [json.dumps(row)])
+        post = Post.objects.get(text='Импорт')
+        self.assertEqual(post.group.slug, 'new')
+
+    def test_pages_are_built_on_primary_after_change(self):
+        """Страница, собранная сразу после записи, свежая и после окна"""
+        self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост в ленте'}
+        )
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый пост в ленте')
+        self.replicate()
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            response = self.guest_client.get(reverse('posts:index'))
+            self.assertContains(response, 'Новый пост в ленте')
+            Post.objects.create(text='Пост мимо реплики', author=self.author)
+            response = self.guest_client.get(reverse('posts:index'))
+            self.assertNotContains(response, 'Пост мимо реплики')
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='timing_author')
+        Post.objects.create(text='Пост', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_timing(self, response):
+        return dict(
+            part.split(';', 1)
+            for part in response['Server-Timing'].split(', ')
+        )
+
+    def test_header_counts_queries_and_cache(self):
+        """Server-Timing: запросы к базе, шаблон, кеш и имя представления"""
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            timing = self.get_timing(self.client.get(reverse('posts:index')))
+        self.assertEqual(timing['view'], 'desc="posts:index"')
+        self.assertRegex(timing['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+        self.assertRegex(timing['tpl'], r'^dur=[\d.]+$')
+        self.assertRegex(timing['cache'], r'^desc="0 hits [1-9]\d* misses"$')
+        self.assertIn('view=posts:index', logs.output[0])
+        self.assertIn('status=200', logs.output[0])
+        timing = self.get_timing(self.client.get(reverse('posts:index')))
+        self.assertEqual(timing['db'], 'dur=0.00;desc="0 queries"')
+        self.assertEqual(timing['cache'], 'desc="1 hits 0 misses"')
+
+    def test_unresolved_path(self):
+        """Для ненайденного адреса имени представления нет"""
+        timing = self.get_timing(self.client.get('/nonexist-page/'))
+        self.assertEqual(timing['view'], 'desc="-"')
+
+    def test_header_is_hidden_from_public(self):
+        """Посторонним заголовок не отдаётся, сотрудникам — отдаётся"""
+        url = reverse('posts:index')
+        response = self.client.get(url, REMOTE_ADDR='203.0.113.5')
+        self.assertFalse(response.has_header('Server-Timing'))
+        staff = User.objects.create_user(
+            username='timing_staff', is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get(url, REMOTE_ADDR='203.0.113.5')
+        self.assertTrue(response.has_header('Server-Timing'))
+        with override_settings(SERVER_TIMING_PUBLIC=True):
+            response = self.client_class().get(url, REMOTE_ADDR='203.0.113.5')
+        self.assertTrue(response.has_header('Server-Timing'))
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import CONTENT_TYPE, Registry, add_hit_ratios, render
+from posts.models import Post, User
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='metrics_author')
+        Post.objects.create(text='Пост', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_endpoint_exposes_views_and_cache(self):
+        """/metrics отдаёт счётчики представлений, кеша и базы"""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        content = response.content.decode()
+        for line in (
+            '# TYPE yatube_request_duration_seconds histogram',
+            'yatube_request_duration_seconds_bucket{view="posts:index",'
+            'le="+Inf"}',
+            'yatube_requests_total{view="posts:index",status="200"}',
+            'yatube_db_queries_total{view="posts:index"}',
+            'yatube_cache_requests_total{cache="page",result="hit"}',
+            'yatube_cache_hit_ratio{cache="page"}',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, content)
+
+    def test_endpoint_is_restricted(self):
+        """/metrics доступен с разрешённых адресов или с токеном"""
+        url = reverse('metrics')
+        outside = {'REMOTE_ADDR': '203.0.113.5'}
+        self.assertEqual(self.client.get(url, **outside).status_code, 404)
+        with override_settings(METRICS_TOKEN='secret'):
+            response = self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer wrong', **outside
+            )
+            self.assertEqual(response.status_code, 404)
+            response = self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer secret', **outside
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_histogram_and_ratio(self):
+        """Корзины гистограммы накопительные, доля попаданий считается"""
+        registry = Registry()
+        registry.observe('yatube_thumbnail_duration_seconds', 0.2)
+        registry.inc(
+            'yatube_cache_requests_total',
+            (('cache', 'fragment'), ('result', 'hit')), 3,
+        )
+        registry.inc(
+            'yatube_cache_requests_total',
+            (('cache', 'fragment'), ('result', 'miss')),
+        )
+        values = registry.collect()
+        add_hit_ratios(values)
+        content = render(values)
+        self.assertIn(
+            'yatube_thumbnail_duration_seconds_bucket{le="0.1"} 0', content
+        )
+        self.assertIn(
+            'yatube_thumbnail_duration_seconds_bucket{le="0.25"} 1', content
+        )
+        self.assertIn(
+            'yatube_thumbnail_duration_seconds_bucket{le="+Inf"} 1', content
+        )
+        self.assertIn('yatube_thumbnail_duration_seconds_count 1', content)
+        self.assertIn('yatube_cache_hit_ratio{cache="fragment"} 0.75', content)
+
+    def test_file_backend_sums_processes(self):
+        """Файлы процессов в METRICS_DIR складываются"""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, '1.json'), 'w') as other:
+                json.dump([['yatube_requests_total', [['view', 'a']], 2]],
+                          other)
+            with override_settings(METRICS_DIR=directory):
+                registry = Registry()
+                registry.inc('yatube_requests_total', (('view', 'a'),))
+                values = registry.collect()
+                path = os.path.join(directory, f'{os.getpid()}.json')
+                self.assertTrue(os.path.exists(path))
+        self.assertEqual(
+            values[('yatube_requests_total', (('view', 'a'),))], 3
+        )
@@ -0,0 +1,79 @@
+import glob
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+PROFILER_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    PROFILER_SAMPLE_RATE=1,
+    PROFILER_THRESHOLD=0,
+    PROFILER_INTERVAL=0.0005,
+    PROFILER_DIR=PROFILER_DIR,
+)
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='profile_author')
+        cls.post = Post.objects.create(text='Пост', author=author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def get_dumps(self, suffix):
+        return glob.glob(
+            os.path.join(PROFILER_DIR, 'posts.post_detail', '*' + suffix)
+        )
+
+    def test_sampling_profile_is_aggregated(self):
+        """Стеки медленных запросов складываются по представлению"""
+        for _ in range(3):
+            Client().get(self.url)
+        self.assertEqual(len(self.get_dumps('.collapsed')), 3)
+        stdout = StringIO()
+        call_command(
+            'aggregate_profiles', view='posts:post_detail',
+            stdout=stdout, stderr=StringIO(),
+        )
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn('core.profiler:__call__', stack)
+
+    @override_settings(PROFILER_MODE='cprofile')
+    def test_cprofile_dump(self):
+        """В режиме cprofile сохраняются файлы pstats"""
+        Client().get(self.url)
+        self.assertEqual(len(self.get_dumps('.pstats')), 1)
+        stdout = StringIO()
+        call_command(
+            'aggregate_profiles', format='pstats', stdout=stdout,
+            stderr=StringIO(),
+        )
+        self.assertIn('post_detail', stdout.getvalue())
+
+    @override_settings(
+        PROFILER_THRESHOLD=60, PROFILER_VIEWS=['posts:index']
+    )
+    def test_fast_and_other_views_are_skipped(self):
+        """Быстрые запросы и другие представления не сохраняются"""
+        Client().get(self.url)
+        Client().get(reverse('posts:index'))
+        self.assertFalse(glob.glob(os.path.join(PROFILER_DIR, '*', '*')))
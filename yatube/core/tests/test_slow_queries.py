@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.slow_queries import fingerprint
+from posts.models import Comment, Post, User
+
+
+class SlowQueryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='slow_author')
+        cls.post = Post.objects.create(text='Пост', author=author)
+        Comment.objects.create(post=cls.post, author=author, text='Коммент')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def get_entries(self):
+        with override_settings(SLOW_QUERY_THRESHOLD=0):
+            with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+                response = self.client.get(self.url)
+        return response, [json.loads(record.getMessage())
+                          for record in logs.records]
+
+    def test_fingerprint_ignores_values(self):
+        """Отпечаток не зависит от значений и длины списка IN"""
+        self.assertEqual(
+            fingerprint('SELECT * FROM a WHERE id IN (%s, %s) AND b = 1'),
+            fingerprint("SELECT * FROM a WHERE id IN (%s)  AND b = 'x'"),
+        )
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM a WHERE id = %s'),
+            fingerprint('SELECT * FROM b WHERE id = %s'),
+        )
+
+    def test_entries_have_plan_view_and_template(self):
+        """Запись журнала: форма параметров, представление, шаблон и план"""
+        response, entries = self.get_entries()
+        self.assertTrue(entries)
+        for entry in entries:
+            self.assertEqual(entry['view'], 'posts:post_detail')
+            self.assertEqual(entry['database'], 'default')
+            if entry['sql'].startswith('SELECT'):
+                self.assertTrue(entry['plan'])
+        self.assertTrue(any(
+            entry['params'] == ['int'] for entry in entries
+        ))
+        self.assertTrue(any(entry['template'] for entry in entries))
+        # Запросы EXPLAIN не входят в счётчики запроса
+        self.assertIn(
+            f'desc="{len(entries)} queries"', response['Server-Timing']
+        )
+
+    def test_report_groups_by_fingerprint(self):
+        """Сводка группирует записи по отпечатку и сортирует по времени"""
+        _, entries = self.get_entries()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow_queries.log')
+            with open(path + '.1', 'w', encoding='utf-8') as log_file:
+                log_file.writelines(json.dumps(entry) + '\n'
+                                    for entry in entries)
+            with open(path, 'w', encoding='utf-8') as log_file:
+                log_file.writelines(json.dumps(entry) + '\n'
+                                    for entry in entries)
+            stdout = StringIO()
+            call_command('slow_query_report', log=path, json=True,
+                         stdout=stdout)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(
+            sum(item['count'] for item in report), 2 * len(entries)
+        )
+        self.assertEqual(
+            len(report), len({entry['fingerprint'] for entry in entries})
+        )
+        totals = [item['total_ms'] for item in report]
+        self.assertEqual(totals, sorted(totals, reverse=True))
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.template.loaders.cached import Loader
+from django.test import TestCase
+
+from core.management.commands.benchmark_templates import Command, make_engine
+from core.template_warmup import get_template_names, warm_up
+
+
+class TemplateWarmupTests(TestCase):
+    def test_cached_loader_configured(self):
+        """Без режима отладки шаблоны читает кеширующий загрузчик"""
+        loaders = engines['django'].engine.template_loaders
+        self.assertEqual(len(loaders), 1)
+        self.assertIsInstance(loaders[0], Loader)
+
+    def test_warm_up_parses_project_templates(self):
+        """Прогрев разбирает все шаблоны проекта, включая include"""
+        engine = make_engine()
+        names = get_template_names(engine)
+        for name in ('base.html', 'includes/article.html',
+                     'posts/includes/paginator.html', 'core/404.html'):
+            self.assertIn(name, names)
+        self.assertFalse(
+            any(name.startswith('admin/') for name in names)
+        )
+        count, _ = warm_up(engine)
+        self.assertEqual(count, len(names))
+        cache = engine.template_loaders[0].get_template_cache
+        self.assertTrue(set(names) <= set(cache))
+
+    def test_benchmark(self):
+        """Замер сравнивает разбор без прогрева и после него"""
+        command = Command()
+        call_command(command, repeat=1, stdout=StringIO())
+        results = command.results
+        self.assertGreater(results['templates'], 0)
+        self.assertGreaterEqual(results['warmup_ms'], 0)
+        for name in ('cold', 'warm'):
+            self.assertEqual(
+                set(results[name]), {'p50_ms', 'p99_ms', 'total_ms'}
+            )
+        names = get_template_names(command.engine)
+        cache = command.engine.template_loaders[0].get_template_cache
+        self.assertEqual(len(names), results['templates'])
+        self.assertTrue(set(names) <= set(cache))
@@ -0,0 +1,206 @@
+from http import HTTPStatus
+
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_GET
+
+from core.cache import cache_page_versioned, condition_versioned
+from posts.freshness import (
+    get_post_freshness, group_scopes, index_scopes, post_etag,
+    post_last_modified, profile_scopes
+)
+from posts.models import Comment, Group, Post, User
+from posts.timeline import FEED_FIELD, FEED_TIEBREAK, get_follow_feed
+from posts.utils import CURSOR_PARAM, get_cursor_page
+
+API_LIMIT = 20  # Объектов на странице по умолчанию
+API_MAX_LIMIT = 100
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+# Поле ответа: (столбцы для only, связи для select_related, значение)
+POST_FIELDS = {
+    'id': (('id',), (), lambda post: post.pk),
+    'text': (('text',), (), lambda post: post.text),
+    'pub_date': (('pub_date',), (), lambda post: isoformat(post.pub_date)),
+    'updated': (('updated',), (), lambda post: isoformat(post.updated)),
+    'author': (
+        ('author', 'author__username'), ('author',),
+        lambda post: post.author.username,
+    ),
+    'group': (
+        ('group', 'group__slug'), ('group',),
+        lambda post: post.group.slug if post.group_id else None,
+    ),
+    'image': (
+        ('image',), (), lambda post: post.image.url if post.image else None
+    ),
+}
+COMMENT_FIELDS = {
+    'id': (('id',), (), lambda comment: comment.pk),
+    'post': (('post',), (), lambda comment: comment.post_id),
+    'author': (
+        ('author', 'author__username'), ('author',),
+        lambda comment: comment.author.username,
+    ),
+    'text': (('text',), (), lambda comment: comment.text),
+    'created': (
+        ('created',), (), lambda comment: isoformat(comment.created)
+    ),
+}
+
+
+def error_response(message, status):
+    return JsonResponse(
+        {'error': message}, status=status, json_dumps_params=JSON_PARAMS
+    )
+
+
+def get_fields(request, available):
+    """Поля из параметра fields=id,text, по умолчанию все"""
+    value = request.GET.get('fields')
+    if not value:
+        return list(available)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(available))
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', API_LIMIT))
+    except ValueError:
+        raise ValueError('limit должен быть числом')
+    return min(max(limit, 1), API_MAX_LIMIT)
+
+
+def select_fields(queryset, fields, available, required=('id',)):
+    """Запрашивает только столбцы и связи выбранных полей"""
+    columns = set(required)
+    related = set()
+    for name in fields:
+        columns.update(available[name][0])
+        related.update(available[name][1])
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def serialize(obj, fields, available):
+    return {name: available[name][2](obj) for name in fields}
+
+
+def page_response(request, queryset, available, field='pub_date',
+                  tiebreak='pk'):
+    """Страница курсорной пагинации: results и курсоры соседних страниц"""
+    try:
+        fields = get_fields(request, available)
+        limit = get_limit(request)
+    except ValueError as error:
+        return error_response(str(error), HTTPStatus.BAD_REQUEST)
+    # Аннотации запрос вычисляет сам, only() нужны лишь столбцы модели
+    required = ('id',) if field in queryset.query.annotations else (
+        'id', field
+    )
+    page = get_cursor_page(
+        select_fields(queryset, fields, available, required),
+        request.GET.get(CURSOR_PARAM),
+        limit,
+        field,
+        tiebreak,
+    )
+    return JsonResponse(
+        {
+            'results': [serialize(obj, fields, available) for obj in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        },
+        json_dumps_params=JSON_PARAMS,
+    )
+
+
+@require_GET
+@condition_versioned(index_scopes)
+@cache_page_versioned(index_scopes)
+def post_list(request):
+    """Все посты"""
+    return page_response(request, Post.objects.all(), POST_FIELDS)
+
+
+@require_GET
+@condition_versioned(group_scopes)
+@cache_page_versioned(group_scopes)
+def group_posts(request, slug):
+    """Посты группы"""
+    group = Group.objects.filter(slug=slug).values_list('pk', flat=True)
+    if not group:
+        return error_response('Группа не найдена', HTTPStatus.NOT_FOUND)
+    return page_response(
+        request, Post.objects.filter(group_id=group[0]), POST_FIELDS
+    )
+
+
+@require_GET
+@condition_versioned(profile_scopes)
+@cache_page_versioned(profile_scopes)
+def profile_posts(request, username):
+    """Посты автора"""
+    author = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    )
+    if not author:
+        return error_response('Автор не найден', HTTPStatus.NOT_FOUND)
+    return page_response(
+        request, Post.objects.filter(author_id=author[0]), POST_FIELDS
+    )
+
+
+@require_GET
+def follow_posts(request):
+    """Лента подписок текущего пользователя"""
+    if not request.user.is_authenticated:
+        return error_response(
+            'Нужна авторизация', HTTPStatus.UNAUTHORIZED
+        )
+    return page_response(
+        request, get_follow_feed(request.user), POST_FIELDS,
+        field=FEED_FIELD, tiebreak=FEED_TIEBREAK,
+    )
+
+
+@require_GET
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def post_detail(request, post_id):
+    """Пост"""
+    try:
+        fields = get_fields(request, POST_FIELDS)
+    except ValueError as error:
+        return error_response(str(error), HTTPStatus.BAD_REQUEST)
+    post = select_fields(
+        Post.objects.filter(pk=post_id), fields, POST_FIELDS
+    ).first()
+    if post is None:
+        return error_response('Пост не найден', HTTPStatus.NOT_FOUND)
+    return JsonResponse(
+        serialize(post, fields, POST_FIELDS), json_dumps_params=JSON_PARAMS
+    )
+
+
+@require_GET
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def post_comments(request, post_id):
+    """Комментарии поста"""
+    if get_post_freshness(request, post_id) is None:
+        return error_response('Пост не найден', HTTPStatus.NOT_FOUND)
+    return page_response(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS,
+        field='created',
+    )
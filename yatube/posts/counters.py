@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from posts.models import Comment, Follow, Post, User, UserStats
+
+# Счётчик: модель и поле, по которому строки относятся к пользователю
+SOURCES = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+    'comments_count': (Comment, 'author'),
+}
+
+
+def change(user_id, field, delta):
+    """Сдвигает счётчик пользователя одним UPDATE без чтения строки"""
+    UserStats.objects.filter(user_id=user_id).update(
+        **{field: Greatest(F(field) + delta, Value(0))}
+    )
+
+
+def count_subquery(model, user_field):
+    """Подзапрос COUNT(*) строк модели для пользователя из внешнего запроса"""
+    counts = model.objects.filter(
+        **{user_field: OuterRef('user')}
+    ).order_by().values(user_field).annotate(total=Count('pk'))
+    return Coalesce(
+        Subquery(counts.values('total'), output_field=IntegerField()),
+        Value(0),
+    )
+
+
+@transaction.atomic
+def rebuild(user_ids=None):
+    """Пересчитывает счётчики по исходным таблицам.
+
+    По умолчанию всех пользователей, иначе только из списка user_ids.
+    """
+    users = User.objects.all()
+    stats = UserStats.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+    UserStats.objects.bulk_create(
+        [
+            UserStats(user_id=pk)
+            for pk in users.filter(
+                stats__isnull=True
+            ).values_list('pk', flat=True).iterator()
+        ],
+        batch_size=1000,
+    )
+    return stats.update(**{
+        field: count_subquery(model, user_field)
+        for field, (model, user_field) in SOURCES.items()
+    })
@@ -0,0 +1,100 @@
+import csv
+import json
+from http import HTTPStatus
+
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from posts.api import (
+    COMMENT_FIELDS, JSON_PARAMS, POST_FIELDS, error_response, select_fields,
+    serialize
+)
+from posts.models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000  # Строк в одной выборке из курсора базы
+KINDS = {
+    'posts': (Post, POST_FIELDS, 'group__slug'),
+    'comments': (Comment, COMMENT_FIELDS, 'post__group__slug'),
+}
+FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку вместо записи"""
+    def write(self, value):
+        return value
+
+
+def get_export_queryset(kind, author=None, group=None, after=None):
+    """Строки выгрузки по возрастанию id.
+
+    Порядок по первичному ключу позволяет продолжить прерванную
+    выгрузку с параметром after — id последней полученной строки.
+    """
+    model, fields, group_lookup = KINDS[kind]
+    queryset = model.objects.all()
+    if author:
+        queryset = queryset.filter(author__username=author)
+    if group:
+        queryset = queryset.filter(**{group_lookup: group})
+    if after:
+        queryset = queryset.filter(pk__gt=after)
+    return select_fields(queryset, list(fields), fields).order_by('pk')
+
+
+def render_rows(kind, queryset, fmt, chunk_size=EXPORT_CHUNK_SIZE,
+                header=True, progress=None):
+    """Строки NDJSON или CSV по одной: память не зависит от объёма.
+
+    В progress, если он передан, записываются число строк и id
+    последней выгруженной строки.
+    """
+    fields = KINDS[kind][1]
+    names = list(fields)
+
+    def rows():
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield serialize(obj, names, fields)
+            # Сюда поток возвращается, когда строка уже записана
+            if progress is not None:
+                progress['rows'] = progress.get('rows', 0) + 1
+                progress['after'] = obj.pk
+
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        if header:
+            yield writer.writerow(names)
+        for row in rows():
+            yield writer.writerow(row.values())
+    else:
+        for row in rows():
+            yield json.dumps(row, **JSON_PARAMS) + '\n'
+
+
+@require_GET
+def export(request, kind):
+    """Потоковая выгрузка постов или комментариев автора или группы"""
+    if not request.user.is_authenticated:
+        return error_response('Нужна авторизация', HTTPStatus.UNAUTHORIZED)
+    if kind not in KINDS:
+        return error_response('Неизвестная выгрузка', HTTPStatus.NOT_FOUND)
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return error_response('Неизвестный формат', HTTPStatus.BAD_REQUEST)
+    try:
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        return error_response(
+            'after должен быть числом', HTTPStatus.BAD_REQUEST
+        )
+    queryset = get_export_queryset(
+        kind, request.GET.get('author'), request.GET.get('group'), after
+    )
+    response = StreamingHttpResponse(
+        render_rows(kind, queryset, fmt), content_type=FORMATS[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
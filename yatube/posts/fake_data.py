@@ -0,0 +1,158 @@
+import json
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from faker import Faker
+
+from posts import counters
+from posts.importer import IMPORT_BATCH_SIZE, import_rows
+from posts.models import Group, Post, User
+
+POPULARITY = 1.1  # Показатель закона Ципфа для авторов, групп и постов
+GROUP_SHARE = 0.7  # Доля постов в группах
+
+
+def zipf_weights(count, exponent=POPULARITY):
+    """Накопленные веса рангов: немногие получают большую часть выборок"""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Generator:
+    """Синтетические данные с правдоподобным распределением.
+
+    Посты, подписки и комментарии загружаются через import_rows, так что
+    счётчики, ленты и кеш страниц обновляются так же, как при импорте.
+    """
+    def __init__(self, seed=None, batch_size=IMPORT_BATCH_SIZE):
+        self.random = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+
+    def create_users(self, count):
+        start = User.objects.count()
+        password = make_password(None)
+        users = [
+            User(
+                username=f'{self.faker.user_name()}_{start + i}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for i in range(count)
+        ]
+        User.objects.bulk_create(users, ignore_conflicts=True)
+        usernames = [user.username for user in users]
+        # bulk_create не вызывает post_save, который создаёт счётчики:
+        # без них профиль молчаливого пользователя остался бы пустым
+        for start in range(0, len(usernames), self.batch_size):
+            counters.rebuild(User.objects.filter(
+                username__in=usernames[start:start + self.batch_size]
+            ).values('pk'))
+        return usernames
+
+    def create_groups(self, count):
+        start = Group.objects.count()
+        groups = [
+            Group(
+                slug=f'{self.faker.slug()}-{start + i}',
+                title=self.faker.catch_phrase()[:200],
+                description=self.faker.paragraph(),
+            )
+            for i in range(count)
+        ]
+        Group.objects.bulk_create(groups, ignore_conflicts=True)
+        return [group.slug for group in groups]
+
+    def post_rows(self, count, authors, groups, days):
+        author_weights = zipf_weights(len(authors))
+        group_weights = zipf_weights(len(groups))
+        # Даты по возрастанию, чтобы порядок id совпадал с порядком дат
+        dates = sorted(
+            self.now - timedelta(seconds=self.random.uniform(0, days * 86400))
+            for _ in range(count)
+        )
+        for pub_date in dates:
+            group = None
+            if groups and self.random.random() < GROUP_SHARE:
+                group = self.random.choices(
+                    groups, cum_weights=group_weights
+                )[0]
+            yield {
+                'text': self.faker.paragraph(
+                    nb_sentences=self.random.randint(1, 8)
+                ),
+                'author': self.random.choices(
+                    authors, cum_weights=author_weights
+                )[0],
+                'group': group,
+                'pub_date': pub_date.isoformat(),
+            }
+
+    def follow_rows(self, users, average):
+        """Граф подписок со степенным распределением.
+
+        Число подписок у пользователя — по Парето со средним average,
+        авторов выбирают по популярности, как в post_rows.
+        """
+        weights = zipf_weights(len(users))
+        for user in users:
+            count = min(
+                len(users) - 1,
+                int(self.random.paretovariate(2) * average / 2),
+            )
+            authors = set(self.random.choices(
+                users, cum_weights=weights, k=count
+            ))
+            authors.discard(user)
+            for author in authors:
+                yield {'user': user, 'author': author}
+
+    def comment_rows(self, count, posts, users):
+        # Свежие посты комментируют чаще
+        posts = sorted(posts, key=lambda post: post[1], reverse=True)
+        post_weights = zipf_weights(len(posts))
+        for _ in range(count):
+            post_id, pub_date = self.random.choices(
+                posts, cum_weights=post_weights
+            )[0]
+            created = pub_date + (self.now - pub_date) * self.random.random()
+            yield {
+                'post': post_id,
+                'author': self.random.choice(users),
+                'text': self.faker.sentence(),
+                'created': created.isoformat(),
+            }
+
+    def load(self, kind, rows):
+        return import_rows(
+            kind, (json.dumps(row) for row in rows), self.batch_size
+        )[0]
+
+    def generate(self, users, groups, posts, comments, follows, days):
+        """Создаёт данные и возвращает число строк каждого вида"""
+        usernames = self.create_users(users)
+        slugs = self.create_groups(groups)
+        result = {'users': len(usernames), 'groups': len(slugs)}
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        result['posts'] = self.load(
+            'posts', self.post_rows(posts, usernames, slugs, days)
+        )
+        result['follows'] = self.load(
+            'follows', self.follow_rows(usernames, follows)
+        )
+        created = list(Post.objects.filter(pk__gt=last_pk).values_list(
+            'pk', 'pub_date'
+        ))
+        result['comments'] = self.load(
+            'comments', self.comment_rows(comments, created, usernames)
+        ) if created else 0
+        return result
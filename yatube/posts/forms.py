@@ -1,6 +1,6 @@
 from django import forms
 
-from posts.models import Post, Comment
+from posts.models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -13,3 +13,15 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Что ищем', max_length=200, required=False)
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        label='Группа',
+        to_field_name='slug',
+        empty_label='Все группы',
+        required=False,
+    )
+    author = forms.CharField(label='Автор', max_length=150, required=False)
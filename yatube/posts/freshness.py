@@ -0,0 +1,58 @@
+from django.db.models import Count, Max
+
+from core.cache import to_last_modified
+from posts.models import Post
+
+
+def index_scopes(request):
+    return ('index',)
+
+
+def group_scopes(request, slug):
+    return (f'group:{slug}',)
+
+
+def profile_scopes(request, username):
+    # Поколение пользователя: кнопка подписки и счётчик его подписок
+    return (f'profile:{username}', f'user:{request.user.pk}')
+
+
+def get_post_freshness(request, post_id):
+    """Время изменения поста, его комментариев и счётчик постов автора.
+
+    Один запрос по индексу комментариев, результат запоминается
+    в запросе для ETag и Last-Modified.
+    """
+    if not hasattr(request, 'post_freshness'):
+        request.post_freshness = Post.objects.filter(pk=post_id).annotate(
+            last_comment=Max('comments__created'),
+            comments_total=Count('comments'),
+        ).values_list(
+            'updated', 'last_comment', 'comments_total',
+            'author__stats__posts_count',
+        ).first()
+    return request.post_freshness
+
+
+def post_etag(request, post_id):
+    freshness = get_post_freshness(request, post_id)
+    if freshness is None:
+        return None
+    updated, last_comment, comments_total, posts_count = freshness
+    return '-'.join(map(str, [
+        updated.timestamp(),
+        last_comment.timestamp() if last_comment else 0,
+        comments_total,
+        posts_count,
+        request.user.pk or 0,
+    ]))
+
+
+def post_last_modified(request, post_id):
+    freshness = get_post_freshness(request, post_id)
+    if freshness is None:
+        return None
+    updated, last_comment = freshness[:2]
+    return to_last_modified(
+        max(updated, last_comment or updated).timestamp()
+    )
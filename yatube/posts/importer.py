@@ -0,0 +1,244 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_generation
+from posts import counters, timeline
+from posts.models import Comment, Follow, Group, Post, User
+from posts.search import install_index, uninstall_index
+
+IMPORT_BATCH_SIZE = 1000  # Строк NDJSON в одной пачке и транзакции
+MODELS = {'posts': Post, 'comments': Comment, 'follows': Follow}
+
+
+class Lookup:
+    """Словарь ключ → id, который подгружает недостающие ключи пачкой.
+
+    Отсутствующие в базе объекты создаются одним bulk_create.
+    """
+    def __init__(self, model, key, defaults):
+        self.model = model
+        self.key = key
+        self.defaults = defaults
+        self.ids = {}
+        self.created = 0
+
+    def load(self, keys):
+        self.ids.update(
+            self.model.objects.filter(
+                **{f'{self.key}__in': keys}
+            ).values_list(self.key, 'pk')
+        )
+
+    def resolve(self, keys):
+        missing = {key for key in keys if key and key not in self.ids}
+        if not missing:
+            return
+        self.load(missing)
+        new = missing - set(self.ids)
+        if new:
+            self.model.objects.bulk_create(
+                [self.model(**{self.key: key}, **self.defaults(key))
+                 for key in new]
+            )
+            self.load(new)
+            self.created += len(new)
+
+    def __getitem__(self, key):
+        return self.ids[key] if key else None
+
+
+def parse_date(value, default):
+    date = parse_datetime(value) if value else None
+    if date is None:
+        return default
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def image_name(value):
+    """Имя файла в хранилище, адрес из выгрузки тоже подходит"""
+    if value and value.startswith(settings.MEDIA_URL):
+        return value[len(settings.MEDIA_URL):]
+    return value or ''
+
+
+class Importer:
+    """Импорт строк NDJSON одного вида (posts, comments или follows)"""
+    def __init__(self, kind):
+        self.kind = kind
+        self.model = MODELS[kind]
+        password = make_password(None)
+        self.users = Lookup(
+            User, 'username', lambda username: {'password': password}
+        )
+        self.groups = Lookup(
+            Group, 'slug', lambda slug: {'title': slug, 'description': ''}
+        )
+        self.author_ids = set()
+        self.user_ids = set()  # Пользователи, чьи счётчики изменились
+        self.scopes = set()
+
+    def build_posts(self, rows):
+        self.users.resolve(row['author'] for row in rows)
+        self.groups.resolve(row.get('group') for row in rows)
+        now = timezone.now()
+        posts = []
+        for row in rows:
+            pub_date = parse_date(row.get('pub_date'), now)
+            posts.append(Post(
+                id=row.get('id'),
+                text=row['text'],
+                author_id=self.users[row['author']],
+                group_id=self.groups[row.get('group')],
+                image=image_name(row.get('image')),
+                pub_date=pub_date,
+                updated=parse_date(row.get('updated'), pub_date),
+            ))
+            self.author_ids.add(self.users[row['author']])
+            self.user_ids.add(self.users[row['author']])
+            self.scopes.add(f'profile:{row["author"]}')
+            if row.get('group'):
+                self.scopes.add(f'group:{row["group"]}')
+        self.scopes.add('index')
+        return posts
+
+    def build_comments(self, rows):
+        self.users.resolve(row['author'] for row in rows)
+        self.user_ids.update(self.users[row['author']] for row in rows)
+        now = timezone.now()
+        return [
+            Comment(
+                id=row.get('id'),
+                post_id=row['post'],
+                author_id=self.users[row['author']],
+                text=row['text'],
+                created=parse_date(row.get('created'), now),
+            )
+            for row in rows
+        ]
+
+    def build_follows(self, rows):
+        self.users.resolve(
+            name for row in rows for name in (row['user'], row['author'])
+        )
+        follows = []
+        for row in rows:
+            follows.append(Follow(
+                user_id=self.users[row['user']],
+                author_id=self.users[row['author']],
+            ))
+            self.author_ids.add(self.users[row['author']])
+            self.user_ids.update(
+                (self.users[row['user']], self.users[row['author']])
+            )
+            self.scopes.add(f'profile:{row["author"]}')
+            self.scopes.add(f'user:{self.users[row["user"]]}')
+        return follows
+
+    def save(self, rows, batch_size):
+        objs = getattr(self, f'build_{self.kind}')(rows)
+        with transaction.atomic():
+            self.model.objects.bulk_create(
+                objs,
+                batch_size=batch_size,
+                ignore_conflicts=self.kind == 'follows',
+            )
+
+    def finish(self):
+        """То, что при обычном сохранении делают сигналы, одним проходом"""
+        user_ids = sorted(self.user_ids)
+        for start in range(0, len(user_ids), IMPORT_BATCH_SIZE):
+            counters.rebuild(user_ids[start:start + IMPORT_BATCH_SIZE])
+        cache.delete(timeline.PULL_AUTHORS_KEY)
+        follows = Follow.objects.filter(author_id__in=self.author_ids)
+        for follow in follows.iterator():
+            timeline.backfill(follow)
+        bump_generation(*self.scopes)
+
+
+@contextmanager
+def keep_dates(model):
+    """Отключает auto_now и auto_now_add, чтобы сохранить даты источника.
+
+    Меняет поля модели на время блока, поэтому годится только для
+    отдельного процесса импорта.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def deferred_indexes(model):
+    """Удаляет составные индексы модели на время вставки.
+
+    Индексы и полнотекстовый индекс постов строятся заново один раз
+    по готовой таблице, а не обновляются на каждой строке.
+    """
+    with connection.schema_editor() as editor:
+        for index in model._meta.indexes:
+            editor.remove_index(model, index)
+    if model is Post:
+        uninstall_index(connection)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+        if model is Post:
+            install_index(connection)
+
+
+def batches(lines, size):
+    lines = iter(lines)
+    while True:
+        rows = [json.loads(line) for line in islice(lines, size)
+                if line.strip()]
+        if not rows:
+            return
+        yield rows
+
+
+def import_rows(kind, lines, batch_size=IMPORT_BATCH_SIZE,
+                defer_indexes=False, report=None):
+    """Импортирует строки NDJSON пачками через bulk_create.
+
+    Строки читаются лениво, поэтому память зависит от размера пачки,
+    а не файла. report(строк, секунд) вызывается после каждой пачки.
+    Возвращает число строк и время в секундах.
+    """
+    importer = Importer(kind)
+    total = 0
+    started = time.monotonic()
+    indexes = deferred_indexes(importer.model) if defer_indexes else (
+        nullcontext()
+    )
+    with keep_dates(importer.model), indexes:
+        for rows in batches(lines, batch_size):
+            importer.save(rows, batch_size)
+            total += len(rows)
+            if report is not None:
+                report(total, time.monotonic() - started)
+    importer.finish()
+    return total, time.monotonic() - started
@@ -0,0 +1,128 @@
+import json
+import random
+import time
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmark import get_revision, summarize
+from posts.models import Follow, Group, Post, User
+
+SAMPLE_SIZE = 100  # Сколько групп, авторов, постов и читателей опрашивать
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число запросов страниц постов через '
+        'тестовый клиент и пишет p50/p95/p99 в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Запросов к каждой странице',
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом',
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', default='benchmark.json')
+
+    def get_targets(self):
+        """Страница → список пар (адрес, клиент) для случайного выбора"""
+        anonymous = Client()
+        slugs = Group.objects.values_list('slug', flat=True)[:SAMPLE_SIZE]
+        authors = User.objects.filter(
+            stats__posts_count__gt=0
+        ).values_list('username', flat=True)[:SAMPLE_SIZE]
+        post_ids = Post.objects.values_list('pk', flat=True)[:SAMPLE_SIZE]
+        readers = []
+        for user in User.objects.filter(
+            pk__in=Follow.objects.values('user_id')[:SAMPLE_SIZE]
+        ):
+            client = Client()
+            client.force_login(user)
+            readers.append(client)
+        return {
+            'index': [(reverse('posts:index'), anonymous)],
+            'group_list': [
+                (reverse('posts:group_list', args=(slug,)), anonymous)
+                for slug in slugs
+            ],
+            'profile': [
+                (reverse('posts:profile', args=(username,)), anonymous)
+                for username in authors
+            ],
+            'post_detail': [
+                (reverse('posts:post_detail', args=(pk,)), anonymous)
+                for pk in post_ids
+            ],
+            'follow_index': [
+                (reverse('posts:follow_index'), client) for client in readers
+            ],
+        }
+
+    def fetch(self, client, url, cold):
+        if cold:
+            cache.clear()
+        with ExitStack() as stack:
+            captured = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in connections
+            ]
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, sum(map(len, captured))
+
+    def measure(self, targets, rng, options):
+        for _ in range(options['warmup']):
+            url, client = rng.choice(targets)
+            self.fetch(client, url, options['cold'])
+        timings, queries, statuses = [], [], {}
+        for _ in range(options['requests']):
+            url, client = rng.choice(targets)
+            status, elapsed, count = self.fetch(client, url, options['cold'])
+            timings.append(elapsed)
+            queries.append(count)
+            statuses[status] = statuses.get(status, 0) + 1
+        return dict(summarize(timings, queries), statuses=statuses)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.results = {
+            'revision': get_revision(),
+            'created': timezone.now().isoformat(),
+            'cold': options['cold'],
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+            'views': {},
+        }
+        for name, targets in self.get_targets().items():
+            if not targets:
+                self.stderr.write(f'{name}: нет данных, пропущено')
+                continue
+            result = self.results['views'][name] = self.measure(
+                targets, rng, options
+            )
+            self.stdout.write(
+                f'{name}: p50 {result["p50_ms"]:.2f} мс, '
+                f'p95 {result["p95_ms"]:.2f} мс, '
+                f'p99 {result["p99_ms"]:.2f} мс, '
+                f'запросов {result["queries_p50"]}'
+            )
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(self.results, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
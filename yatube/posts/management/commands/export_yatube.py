@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from posts.export import (
+    EXPORT_CHUNK_SIZE, FORMATS, KINDS, get_export_queryset, render_rows
+)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты или комментарии в NDJSON или CSV потоком'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(KINDS))
+        parser.add_argument(
+            '--format', choices=list(FORMATS), default='ndjson'
+        )
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument('--group', help='Слаг группы')
+        parser.add_argument(
+            '--after', type=int, default=0,
+            help='Продолжить после строки с этим id (дописывает в --output)',
+        )
+        parser.add_argument(
+            '--output', help='Файл выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        resume = bool(options['after'] and options['output'])
+        progress = {'rows': 0, 'after': options['after']}
+        rows = render_rows(
+            options['kind'],
+            get_export_queryset(
+                options['kind'], options['author'], options['group'],
+                options['after'],
+            ),
+            options['format'],
+            options['chunk_size'],
+            header=not resume,
+            progress=progress,
+        )
+        if options['output']:
+            output = open(
+                options['output'], 'a' if resume else 'w',
+                encoding='utf-8', newline='',
+            )
+        else:
+            output = self.stdout
+        try:
+            for line in rows:
+                output.write(line)
+        finally:
+            if output is not self.stdout:
+                output.close()
+            self.stderr.write(
+                f'Выгружено строк: {progress["rows"]}, '
+                f'продолжить: --after {progress["after"]}'
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from posts.fake_data import Generator
+from posts.importer import IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт пользователей, группы, посты, подписки и комментарии '
+        'для нагрузочных замеров'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Среднее число подписок пользователя',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределены даты постов',
+        )
+        parser.add_argument(
+            '--seed', type=int, help='Зерно для воспроизводимых данных'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        result = Generator(options['seed'], options['batch_size']).generate(
+            options['users'], options['groups'], options['posts'],
+            options['comments'], options['follows'], options['days'],
+        )
+        self.stdout.write(', '.join(
+            f'{kind}: {count}' for kind, count in result.items()
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnail
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры для постов с картинкой, у которых их ещё нет'
+
+    def handle(self, *args, **options):
+        post_ids = Post.objects.exclude(image='').filter(
+            thumbnail=''
+        ).values_list('pk', flat=True)
+        total = 0
+        for post_id in post_ids.iterator():
+            generate_thumbnail(post_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Построено миниатюр: {total}'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from posts.importer import IMPORT_BATCH_SIZE, MODELS, import_rows
+
+
+class Command(BaseCommand):
+    help = 'Загружает посты, комментарии или подписки из NDJSON пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(MODELS))
+        parser.add_argument('path', help='Файл NDJSON, например из выгрузки')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Удалить индексы на время загрузки и построить заново',
+        )
+
+    def report(self, rows, seconds):
+        self.stderr.write(
+            f'Загружено строк: {rows}, {rows / max(seconds, 1e-9):.0f} '
+            f'строк/с'
+        )
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8') as source:
+            rows, seconds = import_rows(
+                options['kind'],
+                source,
+                options['batch_size'],
+                options['defer_indexes'],
+                report=self.report,
+            )
+        self.stdout.write(
+            f'Загружено строк: {rows} за {seconds:.2f} с, '
+            f'{rows / max(seconds, 1e-9):.0f} строк/с'
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, подписок и комментариев'
+
+    def handle(self, *args, **options):
+        updated = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны счётчики {updated} пользователей')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.thumbnails import sweep_images
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки и их варианты, на которые не ссылаются посты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=None,
+            help='Не удалять файлы моложе стольких секунд',
+        )
+
+    def handle(self, *args, **options):
+        deleted = sweep_images(options['grace'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено файлов: {deleted}'))
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def fill_stats(apps, schema_editor):
+    """Счётчики коррелированными подзапросами, как posts.counters.rebuild.
+
+    Count по четырём обратным связям в одном annotate перемножил бы
+    строки постов, подписчиков, подписок и комментариев каждого
+    пользователя.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserStats = apps.get_model('posts', 'UserStats')
+    sources = {
+        'posts_count': (apps.get_model('posts', 'Post'), 'author'),
+        'followers_count': (apps.get_model('posts', 'Follow'), 'author'),
+        'following_count': (apps.get_model('posts', 'Follow'), 'user'),
+        'comments_count': (apps.get_model('posts', 'Comment'), 'author'),
+    }
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=pk)
+            for pk in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+    def count_subquery(model, user_field):
+        counts = model.objects.filter(
+            **{user_field: models.OuterRef('user')}
+        ).order_by().values(user_field).annotate(total=models.Count('pk'))
+        return Coalesce(
+            models.Subquery(
+                counts.values('total'), output_field=models.IntegerField()
+            ),
+            models.Value(0),
+        )
+
+    UserStats.objects.update(**{
+        field: count_subquery(model, user_field)
+        for field, (model, user_field) in sources.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0016_auto_20261018_0222'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+            ],
+            options={
+                'verbose_name': 'Счётчики пользователя',
+                'verbose_name_plural': 'Счётчики пользователей',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations
+
+# Копия posts.timeline.TRIM_SQL для всех пользователей: миграция
+# не должна зависеть от того, как модуль изменится потом
+TRIM_SQL = """
+DELETE FROM {table} WHERE id IN (
+    SELECT id FROM (
+        SELECT id, COUNT(*) OVER (
+            PARTITION BY user_id ORDER BY pub_date, id
+            ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING
+        ) AS position
+        FROM {table}
+    ) AS ranked WHERE position > %s
+)
+"""
+
+
+def fill_timelines(apps, schema_editor):
+    """Ленты для подписок, созданных до материализованной ленты"""
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    UserStats = apps.get_model('posts', 'UserStats')
+    pull_author_ids = UserStats.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).values('user_id')
+    follows = Follow.objects.exclude(
+        author_id__in=pull_author_ids
+    ).values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        posts = Post.objects.filter(author_id=author_id).order_by(
+            '-pub_date', '-pk'
+        ).values_list('pk', 'pub_date')[:settings.TIMELINE_LENGTH]
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, post_id=pk, pub_date=date)
+                for pk, date in posts
+            ],
+            ignore_conflicts=True,
+        )
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TRIM_SQL.format(
+                table=connection.ops.quote_name(TimelineEntry._meta.db_table)
+            ),
+            [settings.TIMELINE_LENGTH],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_post_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
+import json
+
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from posts.storage import ContentAddressedStorage
+
 
 User = get_user_model()
 TEXT_LIMIT = 15  # Ограничение количтсве символов
@@ -29,6 +33,7 @@ class Post(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -47,17 +52,63 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
+        db_index=True,
         help_text='Загрузите картинку',
     )
+    thumbnail = models.CharField(
+        'Миниатюра',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    image_variants = models.TextField(
+        'Варианты картинки',
+        blank=True,
+        editable=False,
+    )
 
     def __str__(self):
         return self.text[:TEXT_LIMIT]
 
+    def get_image_variants(self):
+        """Варианты картинки: {формат: [(ширина, адрес), ...]}"""
+        storage = self.image.storage
+        try:
+            return {
+                fmt: sorted(
+                    (int(width), storage.url(name))
+                    for width, name in sizes.items()
+                )
+                for fmt, sizes in json.loads(self.image_variants).items()
+            }
+        except (ValueError, AttributeError):
+            return {}
+
+    @property
+    def thumbnail_url(self):
+        """Готовая миниатюра, а пока её нет — сама картинка"""
+        if self.thumbnail:
+            return self.image.storage.url(self.thumbnail)
+        return self.image.url
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Сообщение'
         verbose_name_plural = 'Сообщения'
+        # Столбцы по возрастанию: SQLite дописывает rowid в конец индекса,
+        # и обратный проход отдаёт порядок (-pub_date, -pk) без сортировки
+        indexes = [
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -91,6 +142,12 @@ class Comment(models.Model):
         ordering = ['-created']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -119,3 +176,70 @@ class Follow(models.Model):
                 name='unique_follow',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user_idx',
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    comments_count = models.PositiveIntegerField('Комментариев', default=0)
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField('Дата публикации поста')
+
+    def __str__(self):
+        return f'{self.post} в ленте {self.user}'
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry',
+            ),
+        ]
+        indexes = [
+            # post в конце: порядок (-pub_date, -post) ленты подписок
+            # и обрезки ленты берётся из индекса без сортировки
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
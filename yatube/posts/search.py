@@ -0,0 +1,118 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from posts.models import Post
+
+FTS_TABLE = 'posts_post_fts'
+TERMS_LIMIT = 10  # Сколько слов запроса уходит в поиск
+TERM_RE = re.compile(r'[^\W_]+')  # Слово в понимании токенизатора unicode61
+# Внешняя таблица FTS5 хранит только индекс, текст берётся из posts_post
+FTS_INDEX = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF text ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END
+    """,
+}
+
+
+def install_index(connection):
+    """Создаёт индекс FTS5 и триггеры, которые держат его в актуальном виде.
+
+    Пересборка таблицы в миграциях SQLite удаляет её триггеры, поэтому
+    функция вызывается и после каждого migrate: недостающие триггеры
+    создаются заново, а индекс перестраивается по текущим постам.
+    """
+    if (connection.vendor != 'sqlite'
+            or 'posts_post' not in connection.introspection.table_names()):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            " AND tbl_name = 'posts_post'"
+        )
+        if set(FTS_TRIGGERS) <= {row[0] for row in cursor.fetchall()}:
+            return
+        cursor.execute(FTS_INDEX)
+        for statement in FTS_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def uninstall_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def get_terms(query):
+    return TERM_RE.findall(query.lower())[:TERMS_LIMIT]
+
+
+def build_match(terms):
+    """Выражение MATCH: все слова запроса как префиксы.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 из запроса
+    пользователя не интерпретируются, а звёздочка находит словоформы
+    («котик» по запросу «кот»).
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_posts(query, queryset=None):
+    """Посты, подходящие под запрос, от самых релевантных.
+
+    В SQLite запрос идёт через индекс FTS5 и сортируется по bm25
+    (скрытый столбец rank), в остальных СУБД — через icontains.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        condition = Q()
+        for term in terms:
+            condition &= Q(text__icontains=term)
+        return queryset.filter(condition)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {Post._meta.db_table}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[build_match(terms)],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank', '-pub_date'],
+    )
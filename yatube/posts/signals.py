@@ -0,0 +1,132 @@
+from django.db import connections
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import bump_generation
+from posts import counters, timeline
+from posts.search import install_index
+from posts.models import Comment, Follow, Group, Post, User, UserStats
+
+
+def bump_post_pages(post, group_ids):
+    """Сбрасывает кеш страниц, на которых виден пост"""
+    slugs = Group.objects.filter(
+        pk__in={pk for pk in group_ids if pk}
+    ).values_list('slug', flat=True)
+    bump_generation(
+        'index',
+        f'profile:{post.author.username}',
+        *(f'group:{slug}' for slug in slugs),
+    )
+
+
+def bump_follow_pages(follow):
+    """Сбрасывает профиль автора и страницы подписчика со счётчиком подписок"""
+    bump_generation(
+        f'profile:{follow.author.username}', f'user:{follow.user_id}'
+    )
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    """У нового пользователя сразу появляются счётчики"""
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Group)
+def remember_previous_slug(sender, instance, raw=False, **kwargs):
+    """Запоминает прежний адрес группы"""
+    instance.previous_slug = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    """Карточки постов группы показывают её название и адрес.
+
+    Они есть в ленте, на странице группы под старым и новым адресом
+    и в профилях авторов группы.
+    """
+    if raw:
+        return
+    Post.objects.filter(group=instance).update(updated=timezone.now())
+    slugs = {instance.slug, getattr(instance, 'previous_slug', None)}
+    usernames = User.objects.filter(posts__group=instance).distinct(
+    ).values_list('username', flat=True)
+    bump_generation(
+        'index',
+        *(f'group:{slug}' for slug in slugs if slug),
+        *(f'profile:{username}' for username in usernames),
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, raw=False, **kwargs):
+    """Запоминает прежнюю группу поста"""
+    previous = Post.objects.filter(pk=instance.pk).values(
+        'group_id'
+    ).first() if instance.pk else None
+    instance.previous = previous or {}
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """Новый пост попадает в ленты и счётчик, страницы с ним устаревают"""
+    if raw:
+        return
+    if created:
+        counters.change(instance.author_id, 'posts_count', 1)
+        timeline.fan_out(instance)
+    bump_post_pages(
+        instance, (instance.group_id, instance.previous.get('group_id'))
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    """Картинку удалённого поста убирает sweep_images"""
+    counters.change(instance.author_id, 'posts_count', -1)
+    bump_post_pages(instance, (instance.group_id,))
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change(instance.author_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change(instance.author_id, 'comments_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    """Подписка обновляет счётчики и добавляет в ленту посты автора"""
+    if created and not raw:
+        counters.change(instance.author_id, 'followers_count', 1)
+        counters.change(instance.user_id, 'following_count', 1)
+        timeline.backfill(instance)
+        bump_follow_pages(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """Отписка обновляет счётчики и убирает посты автора из ленты"""
+    counters.change(instance.author_id, 'followers_count', -1)
+    counters.change(instance.user_id, 'following_count', -1)
+    timeline.remove(instance)
+    bump_follow_pages(instance)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """Возвращает триггеры поиска, если миграция пересобрала posts_post"""
+    if sender.name == 'posts':
+        install_index(connections[using])
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый файл один раз под хешем его содержимого.
+
+    Имя строится как <каталог>/<2 символа хеша>/<хеш><расширение>,
+    поэтому повторная загрузка того же файла не пишет на диск.
+    Повторная загрузка обновляет время изменения файла: sweep_images
+    не трогает файлы моложе IMAGE_SWEEP_GRACE.
+    """
+    def touch(self, name):
+        """Отмечает существующий файл как используемый"""
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get_digest(self, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        return digest.hexdigest()
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = self.get_digest(content)
+        name = posixpath.join(
+            posixpath.dirname(name.replace('\\', '/')),
+            digest[:2],
+            digest + os.path.splitext(name)[1].lower(),
+        )
+        if self.touch(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_derived(self, name, content):
+        """Сохраняет производный файл под заданным именем без хеширования.
+
+        Имя производного файла строится из хеша оригинала, поэтому
+        существующий файл уже содержит нужные данные.
+        """
+        if self.touch(name):
+            return name
+        return super().save(name, content)
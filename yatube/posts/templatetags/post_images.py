@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+SIZES = '(max-width: 960px) 100vw, 960px'
+SOURCE_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+
+def srcset(variants):
+    return ', '.join(f'{url} {width}w' for width, url in variants)
+
+
+@register.simple_tag
+def post_image(post, css_class='card-img my-2'):
+    """Картинка поста с srcset по готовым вариантам размеров и форматов"""
+    if not post.image:
+        return ''
+    variants = post.get_image_variants()
+    if 'jpeg' not in variants:
+        return format_html(
+            '<img class="{}" src="{}">', css_class, post.thumbnail_url
+        )
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (source_type, srcset(variants[fmt]), SIZES)
+            for fmt, source_type in SOURCE_TYPES.items()
+            if fmt in variants
+        ),
+    )
+    return format_html(
+        '<picture>{}<img class="{}" src="{}" srcset="{}" sizes="{}">'
+        '</picture>',
+        sources,
+        css_class,
+        post.thumbnail_url,
+        srcset(variants['jpeg']),
+        SIZES,
+    )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='api_author')
+        cls.reader = User.objects.create_user(username='api_reader')
+        cls.group = Group.objects.create(
+            slug='api_slug',
+            title='api_title',
+            description='api_description',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group
+            )
+            for i in range(25)
+        ]
+        cls.post = cls.posts[-1]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Коммент {i}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_walk_with_cursor(self):
+        """Ленты отдаются страницами по курсору без пропусков"""
+        urls = [
+            reverse('api_v1:post_list'),
+            reverse('api_v1:group_posts', kwargs={'slug': 'api_slug'}),
+            reverse(
+                'api_v1:profile_posts', kwargs={'username': 'api_author'}
+            ),
+        ]
+        expected = [post.pk for post in reversed(self.posts)]
+        for url in urls + [reverse('api_v1:follow_posts')]:
+            with self.subTest(url=url):
+                ids = []
+                params = {'fields': 'id', 'limit': 10}
+                while True:
+                    data = self.reader_client.get(url, params).json()
+                    ids += [item['id'] for item in data['results']]
+                    if data['next'] is None:
+                        break
+                    params['cursor'] = data['next']
+                self.assertEqual(ids, expected)
+
+    def test_field_selection(self):
+        """Параметр fields оставляет только нужные поля и связи"""
+        url = reverse('api_v1:post_list')
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {'fields': 'id,text'}).json()
+        self.assertEqual(
+            data['results'][0], {'id': self.post.pk, 'text': self.post.text}
+        )
+        cache.clear()
+        item = self.client.get(url).json()['results'][0]
+        self.assertEqual(item['author'], 'api_author')
+        self.assertEqual(item['group'], 'api_slug')
+        self.assertEqual(
+            set(item), {
+                'id', 'text', 'pub_date', 'updated', 'author', 'group',
+                'image',
+            }
+        )
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_post_detail_and_comments(self):
+        """Пост и его комментарии, 304 по ETag"""
+        url = reverse('api_v1:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.client.get(url, {'fields': 'id,author'})
+        self.assertEqual(
+            response.json(), {'id': self.post.pk, 'author': 'api_author'}
+        )
+        response = self.client.get(
+            url, {'fields': 'id,author'},
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        data = self.client.get(reverse(
+            'api_v1:post_comments', kwargs={'post_id': self.post.pk}
+        ), {'fields': 'text,author'}).json()
+        self.assertEqual(data['results'], [
+            {'text': f'Коммент {i}', 'author': 'api_reader'}
+            for i in reversed(range(3))
+        ])
+
+    def test_errors_are_json(self):
+        """Ошибки API отдаются в JSON"""
+        cases = [
+            (reverse('api_v1:post_detail', kwargs={'post_id': 0}),
+             HTTPStatus.NOT_FOUND),
+            (reverse('api_v1:post_comments', kwargs={'post_id': 0}),
+             HTTPStatus.NOT_FOUND),
+            (reverse('api_v1:group_posts', kwargs={'slug': 'none'}),
+             HTTPStatus.NOT_FOUND),
+            (reverse('api_v1:follow_posts'), HTTPStatus.UNAUTHORIZED),
+        ]
+        for url, status in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('error', response.json())
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.fake_data import Generator
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, User, UserStats
+)
+
+
+class GenerateDataTests(TestCase):
+    def test_generate_data(self):
+        """Генератор создаёт связанные данные с перекосом популярности"""
+        call_command(
+            'generate_data', users=20, groups=3, posts=200, comments=50,
+            follows=4, seed=1, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        counts = sorted(
+            User.objects.values_list('stats__posts_count', flat=True),
+            reverse=True,
+        )
+        # Первые по популярности авторы пишут заметно больше остальных
+        self.assertGreater(counts[0], 3 * counts[len(counts) // 2])
+        dates = list(Post.objects.order_by('pk').values_list(
+            'pub_date', flat=True
+        ))
+        self.assertEqual(dates, sorted(dates))
+
+    def test_created_users_have_stats(self):
+        """У пользователей без постов и подписок тоже есть счётчики"""
+        usernames = Generator(seed=1).create_users(5)
+        stats = UserStats.objects.filter(user__username__in=usernames)
+        self.assertEqual(stats.count(), 5)
+        self.assertEqual(
+            set(stats.values_list('posts_count', 'followers_count')), {(0, 0)}
+        )
+
+
+class BenchmarkViewsTests(TestCase):
+    def test_benchmark_writes_percentiles(self):
+        """Замер пишет перцентили и число запросов каждой страницы"""
+        call_command(
+            'generate_data', users=5, groups=2, posts=20, comments=5,
+            follows=2, seed=2, stdout=StringIO(),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.json')
+            call_command(
+                'benchmark_views', requests=5, warmup=1, seed=1, cold=True,
+                output=path, stdout=StringIO(), stderr=StringIO(),
+            )
+            with open(path, encoding='utf-8') as output:
+                results = json.load(output)
+        self.assertEqual(results['dataset']['posts'], 20)
+        self.assertEqual(set(results['views']), {
+            'index', 'group_list', 'profile', 'post_detail', 'follow_index',
+        })
+        for name, result in results['views'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['statuses'], {'200': 5})
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreater(result['queries_max'], 0)
@@ -0,0 +1,92 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User, UserStats
+
+fill_stats = import_module('posts.migrations.0017_userstats').fill_stats
+
+
+class UserStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_creates_and_deletes(self):
+        """Счётчики меняются при создании и удалении строк"""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(text='Коммент', author=self.reader, post=post)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        author_stats = self.stats(self.author)
+        reader_stats = self.stats(self.reader)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(reader_stats.following_count, 1)
+        self.assertEqual(reader_stats.comments_count, 1)
+        follow.delete()
+        post.delete()
+        author_stats.refresh_from_db()
+        reader_stats.refresh_from_db()
+        self.assertEqual(author_stats.posts_count, 0)
+        self.assertEqual(author_stats.followers_count, 0)
+        self.assertEqual(reader_stats.following_count, 0)
+        self.assertEqual(reader_stats.comments_count, 0)
+
+    def test_rebuild_stats_command_fixes_drift(self):
+        """Команда rebuild_stats пересчитывает разъехавшиеся счётчики"""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserStats.objects.update(posts_count=42, following_count=7)
+        UserStats.objects.filter(user=self.reader).delete()
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).following_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+    def test_migration_counts_with_subqueries(self):
+        """Миграция считает счётчики без перемножения связей"""
+        for i in range(3):
+            post = Post.objects.create(text=f'Пост {i}', author=self.author)
+            Comment.objects.create(post=post, author=self.author, text='Ок')
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserStats.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            fill_stats(apps, None)
+        self.assertFalse(any(
+            'COUNT(DISTINCT' in query['sql'] for query in queries
+        ))
+        stats = self.stats(self.author)
+        self.assertEqual(
+            (stats.posts_count, stats.followers_count, stats.comments_count),
+            (3, 1, 3),
+        )
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+    def test_profile_renders_without_aggregates(self):
+        """Профайл в курсорном режиме рендерится без агрегирующих запросов"""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reader_client.get(
+                reverse('posts:profile', kwargs={'username': 'author'}),
+                {'cursor': ''},
+            )
+        self.assertFalse(
+            [q['sql'] for q in queries if 'COUNT(' in q['sql'].upper()]
+        )
+        self.assertContains(response, 'Всего постов: 1')
+        self.assertContains(response, 'Количество подписчиков: 1')
+        self.assertContains(response, 'Количество подписок: 1')
@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='export_author')
+        cls.other = User.objects.create_user(username='export_other')
+        cls.group = Group.objects.create(
+            slug='export_slug',
+            title='export_title',
+            description='export_description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}, с запятой', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(6)
+        ]
+        Post.objects.create(text='Чужой пост', author=cls.other)
+        Comment.objects.create(
+            post=cls.posts[1], author=cls.other, text='Коммент'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.other)
+        self.url = reverse('api_v1:export', kwargs={'kind': 'posts'})
+
+    def read_ndjson(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_ndjson_export_resumes_after_cursor(self):
+        """NDJSON автора по возрастанию id продолжается с after"""
+        rows = self.read_ndjson(
+            self.client.get(self.url, {'author': 'export_author'})
+        )
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in self.posts]
+        )
+        rows = self.read_ndjson(self.client.get(
+            self.url, {'author': 'export_author', 'after': rows[2]['id']}
+        ))
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in self.posts[3:]]
+        )
+
+    def test_csv_export_of_group(self):
+        """CSV группы: заголовок и строки постов и комментариев"""
+        response = self.client.get(
+            self.url, {'group': 'export_slug', 'format': 'csv'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            [post.text for post in self.posts[1::2]],
+        )
+        rows = self.read_ndjson(self.client.get(
+            reverse('api_v1:export', kwargs={'kind': 'comments'}),
+            {'group': 'export_slug'},
+        ))
+        self.assertEqual([row['text'] for row in rows], ['Коммент'])
+
+    def test_export_errors(self):
+        """Выгрузка требует авторизации и известного формата"""
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_command_appends_when_resumed(self):
+        """Команда пишет файл и дописывает его при продолжении"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.csv')
+            stderr = StringIO()
+            call_command(
+                'export_yatube', 'posts', format='csv', author='export_author',
+                output=path, chunk_size=2, stderr=stderr,
+            )
+            self.assertIn(f'--after {self.posts[-1].pk}', stderr.getvalue())
+            call_command(
+                'export_yatube', 'posts', format='csv', output=path,
+                after=self.posts[-1].pk, stderr=StringIO(),
+            )
+            with open(path, encoding='utf-8', newline='') as export_file:
+                rows = list(csv.DictReader(export_file))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            [post.text for post in self.posts] + ['Чужой пост'],
+        )
@@ -1,5 +1,7 @@
+import hashlib
 import shutil
 import tempfile
+from unittest import mock
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -7,6 +9,8 @@ from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
 from posts.models import Group, Post, User, Comment
+from posts import thumbnails
+from posts.thumbnails import generate_thumbnail
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -45,6 +49,7 @@ class PostFormTests(TestCase):
     def test_create_post(self):
         """Валидная форма создает пост в БД."""
         post_count = Post.objects.count()
+        digest = hashlib.sha256(small_gif).hexdigest()
         uploaded = SimpleUploadedFile(
             name='small.gif',
             content=small_gif,
@@ -70,10 +75,44 @@ class PostFormTests(TestCase):
         self.assertTrue(
             Post.objects.filter(
                 text=form_data['text'],
-                image='posts/small.gif'
+                image=f'posts/{digest[:2]}/{digest}.gif'
             ).exists()
         )
 
+    def test_image_variants_are_pregenerated(self):
+        """Варианты картинки строятся заранее за одно декодирование"""
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='thumb.gif', content=small_gif, content_type='image/gif'
+            )
+        )
+        post_detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}
+        )
+        self.assertContains(self.guest_client.get(post_detail_url),
+                            post.image.url)
+        with mock.patch.object(
+            thumbnails.Image, 'open', wraps=thumbnails.Image.open
+        ) as image_open:
+            generate_thumbnail(post.pk)
+        self.assertEqual(image_open.call_count, 1)
+        post.refresh_from_db()
+        variants = post.get_image_variants()
+        formats = [fmt.lower() for fmt in thumbnails.get_variant_formats()]
+        self.assertEqual(sorted(variants), sorted(formats))
+        for fmt in formats:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(
+                    [width for width, url in variants[fmt]],
+                    sorted(thumbnails.VARIANT_WIDTHS)
+                )
+        self.assertTrue(post.image.storage.exists(post.thumbnail))
+        response = self.guest_client.get(post_detail_url)
+        self.assertContains(response, post.thumbnail_url)
+        self.assertContains(response, ' 320w, ')
+
     def test_post_edit_form(self):
         """Валидная форма редактирует пост."""
         post = Post.objects.create(
@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from posts.export import get_export_queryset, render_rows
+from posts.importer import import_rows
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, User, UserStats
+)
+from posts.search import search_posts
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='import_author')
+        cls.group = Group.objects.create(
+            slug='import_slug',
+            title='import_title',
+            description='import_description',
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                text=f'Импортный пост {i}', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            Comment.objects.create(
+                post=post, author=cls.author, text=f'Коммент {i}'
+            )
+
+    def export(self, kind):
+        return list(render_rows(kind, get_export_queryset(kind), 'ndjson'))
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pk').values_list(
+                'pk', 'text', 'author__username', 'group__slug', 'pub_date',
+                'updated',
+            )),
+            list(Comment.objects.order_by('pk').values_list(
+                'pk', 'post_id', 'author__username', 'text', 'created'
+            )),
+        )
+
+    def test_round_trip_keeps_ids_and_dates(self):
+        """Выгрузка и загрузка обратно сохраняют id, связи и даты"""
+        expected = self.snapshot()
+        posts, comments = self.export('posts'), self.export('comments')
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        reports = []
+        total, _ = import_rows(
+            'posts', posts, batch_size=2,
+            report=lambda rows, seconds: reports.append(rows),
+        )
+        import_rows('comments', comments)
+        self.assertEqual(total, 5)
+        self.assertEqual(reports, [2, 4, 5])
+        self.assertEqual(self.snapshot(), expected)
+        author = User.objects.get(username='import_author')
+        self.assertEqual(author.stats.posts_count, 5)
+        self.assertFalse(author.has_usable_password())
+        self.assertTrue(search_posts('импортный').exists())
+
+    def test_follows_fill_timeline(self):
+        """Загруженные подписки заполняют ленту подписчика"""
+        lines = [json.dumps({'user': 'reader', 'author': 'import_author'})]
+        import_rows('follows', lines * 2)
+        reader = User.objects.get(username='reader')
+        self.assertEqual(Follow.objects.filter(user=reader).count(), 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=reader).count(), 5
+        )
+
+    def test_finish_rebuilds_only_touched_users(self):
+        """После загрузки пересчитываются счётчики только её участников"""
+        other = User.objects.create_user(username='import_other')
+        UserStats.objects.filter(user=other).update(posts_count=7)
+        UserStats.objects.filter(user=self.author).update(followers_count=7)
+        lines = [json.dumps({'user': 'reader', 'author': 'import_author'})]
+        import_rows('follows', lines)
+        self.assertEqual(UserStats.objects.get(user=other).posts_count, 7)
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).followers_count, 1
+        )
+        reader = User.objects.get(username='reader')
+        self.assertEqual(reader.stats.following_count, 1)
+
+
+class DeferredIndexesTests(TransactionTestCase):
+    """Схему SQLite нельзя менять внутри транзакции теста TestCase"""
+    def setUp(self):
+        author = User.objects.create_user(username='import_author')
+        for i in range(5):
+            Post.objects.create(text=f'Импортный пост {i}', author=author)
+
+    def test_command_with_deferred_indexes(self):
+        """Команда загружает файл без индексов и строит их заново"""
+        posts = list(render_rows(
+            'posts', get_export_queryset('posts'), 'ndjson'
+        ))
+        Post.objects.all().delete()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.ndjson')
+            with open(path, 'w', encoding='utf-8') as source:
+                source.writelines(posts)
+            stdout = StringIO()
+            call_command(
+                'import_yatube', 'posts', path, defer_indexes=True,
+                stdout=stdout, stderr=StringIO(),
+            )
+        self.assertIn('Загружено строк: 5', stdout.getvalue())
+        self.assertEqual(Post.objects.count(), 5)
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        for index in Post._meta.indexes:
+            self.assertIn(index.name, indexes)
+        self.assertTrue(search_posts('импортный').exists())
@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class FeedIndexTests(TestCase):
+    """Запросы лент идут по составным индексам без отдельной сортировки"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='index_author')
+        cls.reader = User.objects.create_user(username='index_reader')
+        cls.group = Group.objects.create(
+            slug='index_slug',
+            title='index_title',
+            description='index_description',
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.reader, text='Ок')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def get_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def find_query(self, queries, fragment, ordered=True):
+        matching = [
+            query['sql'] for query in queries
+            if fragment in query['sql']
+            and (not ordered or 'ORDER BY' in query['sql'])
+        ]
+        self.assertTrue(matching, f'Нет запроса с {fragment}')
+        return matching[0]
+
+    def assert_uses_index(self, sql, index):
+        plan = self.get_plan(sql)
+        self.assertIn(f'INDEX {index}', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_views_use_indexes(self):
+        """Главная, подписки, группа, профиль и пост читают по индексу"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cases = [
+            (
+                reverse('posts:group_list', kwargs={'slug': 'index_slug'}),
+                '"posts_post"."group_id" = ',
+                'post_group_pub_date_idx',
+            ),
+            (
+                reverse('posts:profile', kwargs={'username': 'index_author'}),
+                '"posts_post"."author_id" = ',
+                'post_author_pub_date_idx',
+            ),
+            (
+                reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+                '"posts_comment"."post_id" = ',
+                'comment_post_created_idx',
+            ),
+            (
+                reverse('posts:index'),
+                'ORDER BY "posts_post"."pub_date" DESC',
+                'posts_post_pub_date',
+            ),
+            (
+                reverse('posts:follow_index'),
+                '"posts_timelineentry"."user_id" = ',
+                'timeline_user_pub_date_idx',
+            ),
+        ]
+        for url, fragment, index in cases:
+            for params in ({}, {'cursor': ''}):
+                with self.subTest(url=url, params=params):
+                    with CaptureQueriesContext(connection) as queries:
+                        self.client.get(url, params)
+                    self.assert_uses_index(
+                        self.find_query(queries, fragment), index
+                    )
+
+    def test_fan_out_uses_indexes(self):
+        """Раскладка поста по лентам читает подписчиков и ленты по индексам"""
+        with CaptureQueriesContext(connection) as queries:
+            Follow.objects.create(user=self.reader, author=self.author)
+            Post.objects.create(text='Новый пост', author=self.author)
+        self.assert_uses_index(
+            self.find_query(
+                queries, '"posts_follow"."author_id" = ', ordered=False
+            ),
+            'follow_author_user_idx',
+        )
+        self.assert_uses_index(
+            self.find_query(queries, 'OVER ('),
+            'timeline_user_pub_date_idx',
+        )
@@ -0,0 +1,103 @@
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.search import search_posts
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='search_author')
+        cls.other = User.objects.create_user(username='search_other')
+        cls.group = Group.objects.create(
+            slug='search_slug',
+            title='Поисковая группа',
+            description='Описание',
+        )
+        cls.single = Post.objects.create(
+            text='Кот сидит на окне',
+            author=cls.author,
+        )
+        cls.repeated = Post.objects.create(
+            text='Котики, котики и ещё раз котики',
+            author=cls.author,
+            group=cls.group,
+        )
+        cls.foreign = Post.objects.create(
+            text='Чужой кот',
+            author=cls.other,
+        )
+        Post.objects.create(text='Про собак', author=cls.other)
+
+    def setUp(self):
+        self.client = Client()
+
+    def search(self, query, **filters):
+        return [post.pk for post in search_posts(
+            query, Post.objects.filter(**filters)
+        )]
+
+    def test_search_is_ranked_by_relevance(self):
+        """Находит словоформы по префиксу и ставит выше релевантные"""
+        found = self.search('КОТ')
+        self.assertEqual(len(found), 3)
+        self.assertEqual(found[0], self.repeated.pk)
+        self.assertEqual(self.search('собак'), [
+            Post.objects.get(text='Про собак').pk
+        ])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Индекс следует за изменением и удалением постов"""
+        Post.objects.filter(pk=self.single.pk).update(text='Пёс на окне')
+        self.assertNotIn(self.single.pk, self.search('кот'))
+        self.assertEqual(self.search('пёс'), [self.single.pk])
+        self.foreign.delete()
+        self.assertEqual(self.search('кот'), [self.repeated.pk])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Операторы FTS5 в запросе не ломают поиск"""
+        for query in ('"', 'кот OR', 'NEAR(кот', '*', 'text:кот', '-кот'):
+            with self.subTest(query=query):
+                self.search(query)
+        self.assertEqual(self.search('   '), [])
+
+    def test_search_uses_fts_index(self):
+        """Запрос идёт от индекса FTS5, а не перебором таблицы постов"""
+        queryset = search_posts('кот')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+        self.assertNotIn('SCAN TABLE posts_post', plan)
+
+    def test_search_view_filters(self):
+        """Страница поиска фильтрует по группе и автору"""
+        url = reverse('posts:search')
+        cases = [
+            ({'q': 'кот'}, 3),
+            ({'q': 'кот', 'group': self.group.slug}, 1),
+            ({'q': 'кот', 'author': 'search_other'}, 1),
+            ({'q': ''}, None),
+        ]
+        for params, count in cases:
+            with self.subTest(params=params):
+                page_obj = self.client.get(url, params).context['page_obj']
+                if count is None:
+                    self.assertIsNone(page_obj)
+                else:
+                    self.assertEqual(page_obj.paginator.count, count)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс"""
+        model_admin = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/', {'q': 'котик'})
+        queryset, use_distinct = model_admin.get_search_results(
+            request, Post.objects.all(), 'котик'
+        )
+        self.assertFalse(use_distinct)
+        self.assertEqual([post.pk for post in queryset], [self.repeated.pk])
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import Post, User
+from posts.thumbnails import schedule_thumbnail, sweep_images
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)  # изображение
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_ASYNC=False)
+class ContentAddressedStorageTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='storage_user')
+
+    def create_post(self, name):
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name=name, content=small_gif, content_type='image/gif'
+            ),
+        )
+        schedule_thumbnail(post)
+        post.refresh_from_db()
+        return post
+
+    def test_duplicate_upload_is_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом с общими вариантами"""
+        digest = hashlib.sha256(small_gif).hexdigest()
+        first = self.create_post('first.gif')
+        second = self.create_post('second.GIF')
+        self.assertEqual(first.image.name, f'posts/{digest[:2]}/{digest}.gif')
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(
+            os.listdir(os.path.join(TEMP_MEDIA_ROOT, 'posts', digest[:2])),
+            [f'{digest}.gif'],
+        )
+        self.assertTrue(first.image_variants)
+        self.assertEqual(second.image_variants, first.image_variants)
+        self.assertEqual(second.thumbnail, first.thumbnail)
+
+    def test_sweep_deletes_unreferenced_images(self):
+        """sweep_images удаляет файл, когда на него не ссылаются посты"""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.gif')
+        path = first.image.path
+        thumbnail_path = os.path.join(TEMP_MEDIA_ROOT, first.thumbnail)
+        first.delete()
+        self.assertEqual(sweep_images(grace=0), 0)
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertGreater(sweep_images(grace=0), 0)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(thumbnail_path))
+
+    def test_sweep_keeps_reuploaded_images(self):
+        """Повторная загрузка защищает файл от удаления на время grace"""
+        post = self.create_post('first.gif')
+        path = post.image.path
+        post.delete()
+        os.utime(path, (0, 0))
+        self.create_post('again.gif').delete()
+        self.assertEqual(sweep_images(grace=60), 0)
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,105 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Post, TimelineEntry, User
+
+fill_timelines = import_module(
+    'posts.migrations.0024_backfill_timelines'
+).fill_timelines
+
+
+class TimelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def feed_texts(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост копируется в ленты подписчиков"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed_texts(), ['Новый пост'])
+
+    def test_follow_backfills_and_unfollow_cleans_timeline(self):
+        """Подписка наполняет ленту, отписка очищает её"""
+        Post.objects.create(text='Старый пост', author=self.author)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.feed_texts(), ['Старый пост'])
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed_texts(), [])
+
+    @override_settings(TIMELINE_LENGTH=3)
+    def test_timeline_is_trimmed(self):
+        """Лента обрезается до TIMELINE_LENGTH записей"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        for i in range(5):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3
+        )
+        self.assertEqual(self.feed_texts(), ['Пост 4', 'Пост 3', 'Пост 2'])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_fan_out_trims_in_one_query(self):
+        """Раскладка поста обрезает ленты всех подписчиков одним запросом"""
+        readers = [self.reader] + [
+            User.objects.create_user(username=f'reader_{i}') for i in range(4)
+        ]
+        Follow.objects.bulk_create([
+            Follow(user=reader, author=self.author) for reader in readers
+        ])
+        for i in range(2):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            Post.objects.create(text='Пост 2', author=self.author)
+        self.assertEqual(
+            sum('DELETE' in query['sql'] for query in queries), 1
+        )
+        for reader in readers:
+            self.assertEqual(
+                list(TimelineEntry.objects.filter(user=reader).values_list(
+                    'post__text', flat=True
+                ).order_by('-pub_date')),
+                ['Пост 2', 'Пост 1'],
+            )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_is_pulled_on_read(self):
+        """Посты автора с множеством подписчиков не копируются в ленты"""
+        another_reader = User.objects.create_user(username='another')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=another_reader, author=self.author)
+        Post.objects.create(text='Популярный пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed_texts(), ['Популярный пост'])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_migration_fills_existing_follows(self):
+        """Миграция наполняет ленты подписок, созданных до неё"""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=other)
+        Post.objects.create(text='Пост автора', author=self.author)
+        for i in range(2):
+            Post.objects.create(text=f'Пост {i}', author=other)
+        TimelineEntry.objects.all().delete()
+        # Миграции от редактора схемы нужно только соединение
+        fill_timelines(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.feed_texts(), ['Пост 1', 'Пост 0'])
@@ -0,0 +1,120 @@
+from django.test import Client, TestCase, override_settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.utils import (
+    QUERY_LIMIT, CursorPage, decode_cursor, get_cursor_page, get_page_window
+)
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='cursor_user')
+        cls.group = Group.objects.create(
+            slug='cursor_slug',
+            title='cursor_title',
+            description='cursor_description'
+        )
+        Post.objects.bulk_create([
+            Post(text=f'text {i}', author=cls.author, group=cls.group)
+            for i in range(25)
+        ])
+        cls.ordered_pks = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Курсоры проходят ленту вперёд и назад без пропусков"""
+        pages = []
+        page = get_cursor_page(Post.objects.all())
+        self.assertFalse(page.has_previous())
+        while True:
+            pages.append([post.pk for post in page])
+            if not page.has_next():
+                break
+            page = get_cursor_page(Post.objects.all(), page.next_cursor)
+        self.assertEqual(
+            [pk for chunk in pages for pk in chunk], self.ordered_pks
+        )
+        self.assertEqual([len(chunk) for chunk in pages], [10, 10, 5])
+        for expected in reversed(pages[:-1]):
+            page = get_cursor_page(Post.objects.all(), page.previous_cursor)
+            self.assertEqual([post.pk for post in page], expected)
+        self.assertFalse(page.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдаёт первую страницу"""
+        self.assertIsNone(decode_cursor('не курсор'))
+        page = get_cursor_page(Post.objects.all(), 'bm90fGN1cnNvcg')
+        self.assertEqual(
+            [post.pk for post in page], self.ordered_pks[:QUERY_LIMIT]
+        )
+
+    def test_views_switch_to_cursor_mode(self):
+        """Ленты переходят в курсорный режим по параметру cursor"""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'cursor_user'}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, {'cursor': ''})
+                page_obj = response.context['page_obj']
+                self.assertIsInstance(page_obj, CursorPage)
+                self.assertContains(
+                    response, f'?cursor={page_obj.next_cursor}'
+                )
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_cursor_mode_setting(self):
+        """Настройка CURSOR_PAGINATION включает курсоры по умолчанию"""
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        )
+        self.assertIsInstance(response.context['page_obj'], CursorPage)
+        self.assertNotContains(response, '?page=')
+
+
+class PageWindowTest(TestCase):
+    def test_window(self):
+        """Окно: края, соседи текущей страницы и пропуски"""
+        cases = [
+            (1, 1, [1]),
+            (3, 5, [1, 2, 3, 4, 5]),
+            (1, 10000, [1, 2, 3, None, 10000]),
+            (50, 10000, [1, None, 48, 49, 50, 51, 52, None, 10000]),
+            (10000, 10000, [1, None, 9998, 9999, 10000]),
+            # Пропуск из одной страницы показывается номером
+            (5, 10, [1, 2, 3, 4, 5, 6, 7, None, 10]),
+        ]
+        for number, num_pages, window in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(get_page_window(number, num_pages), window)
+
+    def test_paginator_renders_window(self):
+        """Шаблон выводит только окно номеров, а не все страницы"""
+        author = User.objects.create_user(username='window_user')
+        Post.objects.bulk_create([
+            Post(text=f'text {i}', author=author)
+            for i in range(QUERY_LIMIT * 10)
+        ])
+        cache.clear()
+        response = Client().get(reverse('posts:index'), {'page': 5})
+        self.assertEqual(
+            response.context['page_obj'].page_window,
+            [1, 2, 3, 4, 5, 6, 7, None, 10],
+        )
+        content = response.content.decode()
+        self.assertIn('&hellip;', content)
+        self.assertIn('?page=10"', content)
+        self.assertNotIn('?page=9"', content)
@@ -1,14 +1,21 @@
 import shutil
 import tempfile
+import time
+from http import HTTPStatus
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.cache import cache
 from django.urls import reverse
+from django.utils.http import http_date
 from django import forms
 
+from core.cache import MODIFIED_KEY, get_scope_key
 from posts.models import Comment, Group, Follow, Post, User
+from posts.views import COMMENTS_LIMIT
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -111,20 +118,132 @@ class PostViewsTest(TestCase):
                 self.assertTemplateUsed(response, template)
 
     def test_index_cache(self):
-        """Проверка кеша страницы index"""
-        response = self.authorized_client.get(reverse('posts:index'))
+        """Кеш index живёт до изменения постов"""
+        response = self.authorized_client.get(self.index_page)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        response_after_update = self.authorized_client.get(self.index_page)
+        self.assertEqual(response_after_update.content, response.content)
         self.post.delete()
-        response_after_delete = self.authorized_client.get(
-            reverse('posts:index')
+        response_after_delete = self.authorized_client.get(self.index_page)
+        self.assertNotEqual(response_after_delete.content, response.content)
+
+    def test_group_cache_is_invalidated_per_group(self):
+        """Запись в одну группу не сбрасывает кеш другой"""
+        other_group = Group.objects.create(
+            slug='other_slug',
+            title='other_title',
+            description='other_description'
         )
-        self.assertEqual(response_after_delete.content, response.content)
-        cache.clear()
-        response_after_clear_cache = self.authorized_client.get(
-            reverse('posts:index')
+        other_post = Post.objects.create(
+            text='other_post', author=self.author, group=other_group
+        )
+        other_group_page = reverse(
+            'posts:group_list', kwargs={'slug': other_group.slug}
+        )
+        self.authorized_client.get(self.group_list_page)
+        other_response = self.authorized_client.get(other_group_page)
+        Post.objects.filter(pk=other_post.pk).update(text='Без сигналов')
+        Post.objects.create(
+            text='Новый пост группы', author=self.author, group=self.group
+        )
+        self.assertContains(
+            self.authorized_client.get(self.group_list_page),
+            'Новый пост группы'
+        )
+        self.assertEqual(
+            self.authorized_client.get(other_group_page).content,
+            other_response.content
+        )
+
+    def test_article_cards_are_reused_across_pages(self):
+        """Карточка поста рендерится один раз и живёт до его изменения"""
+        Follow.objects.create(user=self.author, author=self.author)
+        self.authorized_client.get(self.index_page)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        follow_page = reverse('posts:follow_index')
+        self.assertContains(
+            self.authorized_client.get(follow_page), 'text_post'
+        )
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        self.assertContains(
+            self.authorized_client.get(follow_page), 'Изменённый пост'
+        )
+
+    def test_group_change_refreshes_article_cards(self):
+        """Переименование группы обновляет карточки её постов"""
+        self.authorized_client.get(self.index_page)
+        self.group.title = 'Новое имя группы'
+        self.group.save()
+        self.assertContains(
+            self.authorized_client.get(self.index_page), 'Новое имя группы'
+        )
+
+    def test_group_rename_refreshes_profile_and_old_slug(self):
+        """После смены адреса группы профиль и старый адрес не из кеша"""
+        self.authorized_client.get(self.profile_page)
+        self.authorized_client.get(self.group_list_page)
+        self.group.title = 'Новое имя группы'
+        self.group.slug = 'new_slug'
+        self.group.save()
+        self.assertContains(
+            self.authorized_client.get(self.profile_page), 'Новое имя группы'
         )
+        response = self.authorized_client.get(self.group_list_page)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_feed_pages_answer_not_modified(self):
+        """Неизменившиеся ленты отвечают 304 без запросов к базе"""
+        guest_client = Client()
+        for url in self.pages_with_paginator:
+            with self.subTest(url=url):
+                etag = guest_client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        etag = guest_client.get(self.index_page)['ETag']
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = guest_client.get(self.index_page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_feed_last_modified(self):
+        """Last-Modified ленты — время последнего изменения её постов"""
+        modified = time.time() - 60
+        cache.set(get_scope_key(MODIFIED_KEY, 'index'), modified, None)
+        response = self.client.get(self.index_page)
+        self.assertEqual(
+            response['Last-Modified'], http_date(int(modified))
+        )
+        response = self.client.get(
+            self.index_page,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(
+            self.index_page, HTTP_IF_MODIFIED_SINCE=http_date(modified)
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_post_detail_answers_not_modified(self):
+        """Страница поста отвечает 304, пока нет новых комментариев"""
+        guest_client = Client()
+        etag = guest_client.get(self.post_detail_page)['ETag']
+        with self.assertNumQueries(1):
+            response = guest_client.get(
+                self.post_detail_page, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
         self.assertNotEqual(
-            response_after_clear_cache.content, response.content
+            self.authorized_client.get(self.post_detail_page)['ETag'], etag
+        )
+        Comment.objects.create(
+            text='Новый коммент', author=self.author, post=self.post
+        )
+        response = guest_client.get(
+            self.post_detail_page, HTTP_IF_NONE_MATCH=etag
         )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
 
     def test_index_page_show_correct_context(self):
         """Шаблон index сформирован с правильным контекстом"""
@@ -166,6 +285,32 @@ class PostViewsTest(TestCase):
                 form_field = response.context['form'].fields[value]
                 self.assertIsInstance(form_field, expected)
 
+    def test_post_detail_queries_do_not_grow_with_comments(self):
+        """Число запросов post_detail не зависит от числа комментариев"""
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.follower_client.get(self.post_detail_page)
+            self.assertEqual(
+                len(response.context['comments']),
+                min(Comment.objects.count(), COMMENTS_LIMIT)
+            )
+            return len(queries)
+
+        few_comments_queries = count_queries()
+        commentators = [
+            User.objects.create_user(username=f'commentator_{i}')
+            for i in range(20)
+        ]
+        Comment.objects.bulk_create([
+            Comment(
+                text=f'Коммент {i}',
+                author=commentators[i % len(commentators)],
+                post=self.post
+            ) for i in range(5000)
+        ])
+        self.assertEqual(count_queries(), few_comments_queries)
+        self.assertLessEqual(few_comments_queries, 6)
+
     def test_post_create_show_correct_context(self):
         """Шаблон create_post сформирован с правильным контекстом"""
         response = self.authorized_client.get(self.post_create_page)
@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.metrics import registry
+from posts.models import Post
+from yatube.routers import use_primary
+
+THUMBNAIL_SIZE = (960, 339)
+VARIANT_WIDTHS = (960, 640, 320)  # От большей к меньшей
+IMAGE_DIRS = ('posts', 'variants')  # Каталоги оригиналов и вариантов
+# Формат Pillow: расширение файла и параметры кодирования
+VARIANT_FORMATS = {
+    'AVIF': ('avif', {'quality': 50}),
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+executor = None
+logger = logging.getLogger(__name__)
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return executor
+
+
+def get_variant_formats():
+    """Форматы, которые умеет кодировать установленный Pillow"""
+    Image.init()
+    return [fmt for fmt in VARIANT_FORMATS if fmt in Image.SAVE]
+
+
+def build_variants(image_field):
+    """Строит набор вариантов картинки за одно декодирование оригинала.
+
+    Оригинал обрезается до пропорций THUMBNAIL_SIZE, каждая следующая
+    ширина получается уменьшением предыдущей, а каждый размер кодируется
+    во все доступные форматы. Возвращает {формат: {ширина: имя файла}}.
+    """
+    storage = image_field.storage
+    stem = os.path.splitext(os.path.basename(image_field.name))[0]
+    with image_field.open('rb') as original:
+        with Image.open(original) as image:
+            frame = ImageOps.fit(
+                image.convert('RGB'), THUMBNAIL_SIZE, Image.LANCZOS
+            )
+    variants = {}
+    for width in VARIANT_WIDTHS:
+        height = round(THUMBNAIL_SIZE[1] * width / THUMBNAIL_SIZE[0])
+        frame = frame.resize((width, height), Image.LANCZOS)
+        for fmt in get_variant_formats():
+            extension, options = VARIANT_FORMATS[fmt]
+            buffer = BytesIO()
+            frame.save(buffer, fmt, **options)
+            name = f'variants/{stem}-{width}.{extension}'
+            variants.setdefault(fmt.lower(), {})[width] = (
+                storage.save_derived(name, ContentFile(buffer.getvalue()))
+            )
+    return variants
+
+
+def generate_thumbnail(post_id):
+    """Строит варианты картинки поста и сохраняет их имена в посте"""
+    post = Post.objects.filter(pk=post_id).select_related('author').first()
+    if post is None or not post.image:
+        return
+    image_name = post.image.name
+    started = time.perf_counter()
+    try:
+        variants = build_variants(post.image)
+    except (OSError, ValueError):
+        logger.exception('Не удалось построить варианты %s', image_name)
+        registry.observe(
+            'yatube_thumbnail_duration_seconds',
+            time.perf_counter() - started, (('result', 'error'),),
+        )
+        return
+    registry.observe(
+        'yatube_thumbnail_duration_seconds',
+        time.perf_counter() - started, (('result', 'ok'),),
+    )
+    if Post.objects.filter(pk=post_id, image=image_name).exists():
+        post.thumbnail = variants['jpeg'][THUMBNAIL_SIZE[0]]
+        post.image_variants = json.dumps(variants)
+        post.save(update_fields=['thumbnail', 'image_variants', 'updated'])
+
+
+def run_in_worker(post_id):
+    try:
+        # Пост только что записан, реплика может его ещё не видеть
+        with use_primary():
+            generate_thumbnail(post_id)
+    finally:
+        connection.close()
+
+
+def copy_from_duplicate(post):
+    """Берёт готовые варианты у поста с той же картинкой.
+
+    Хранилище адресует файлы по содержимому, поэтому у повторно
+    загруженной картинки то же имя, и строить варианты заново не нужно.
+    """
+    duplicate = Post.objects.filter(image=post.image.name).exclude(
+        pk=post.pk
+    ).exclude(image_variants='').values('thumbnail', 'image_variants').first()
+    if duplicate is None:
+        return False
+    post.thumbnail = duplicate['thumbnail']
+    post.image_variants = duplicate['image_variants']
+    post.save(update_fields=['thumbnail', 'image_variants', 'updated'])
+    return True
+
+
+def schedule_thumbnail(post):
+    """Ставит построение вариантов картинки в фоновый пул после коммита.
+
+    Шаблоны читают только готовые имена файлов, поэтому
+    первый просмотр после загрузки не декодирует оригинал.
+    """
+    if not post.image or copy_from_duplicate(post):
+        return
+    post_id = post.pk
+    if settings.THUMBNAIL_ASYNC:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_in_worker, post_id)
+        )
+    else:
+        transaction.on_commit(lambda: generate_thumbnail(post_id))
+
+
+def get_image_names(post):
+    """Имена оригинала и вариантов картинки поста"""
+    names = {post['image'], post['thumbnail']}
+    try:
+        variants = json.loads(post['image_variants'] or '{}')
+        names.update(
+            variant for sizes in variants.values()
+            for variant in sizes.values()
+        )
+    except (ValueError, AttributeError):
+        pass
+    return names - {''}
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for file_name in files:
+        yield posixpath.join(path, file_name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+def sweep_images(grace=None):
+    """Удаляет файлы картинок и вариантов, на которые не ссылаются посты.
+
+    Одинаковые картинки разных постов — один файл, поэтому удалять его
+    вместе с постом небезопасно: параллельная загрузка того же файла
+    может сослаться на него между проверкой и удалением. Файлы моложе
+    grace секунд (IMAGE_SWEEP_GRACE) не удаляются, а повторная загрузка
+    обновляет время файла. Возвращает число удалённых файлов.
+    """
+    if grace is None:
+        grace = settings.IMAGE_SWEEP_GRACE
+    storage = Post._meta.get_field('image').storage
+    # Сначала время, потом ссылки: файл, загруженный после этой отметки,
+    # не удаляется, даже если его пост ещё не записан
+    deadline = timezone.now() - timedelta(seconds=grace)
+    used = set()
+    posts = Post.objects.exclude(image='').values(
+        'image', 'thumbnail', 'image_variants'
+    )
+    for post in posts.iterator():
+        used |= get_image_names(post)
+    deleted = 0
+    for directory in IMAGE_DIRS:
+        if not storage.exists(directory):
+            continue
+        for name in walk(storage, directory):
+            if name in used or storage.get_modified_time(name) > deadline:
+                continue
+            try:
+                storage.delete(name)
+            except (OSError, SuspiciousFileOperation):
+                logger.warning('Не удалось удалить файл %s', name)
+                continue
+            deleted += 1
+    return deleted
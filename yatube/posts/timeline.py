@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q
+
+from posts.models import Follow, Post, TimelineEntry, UserStats
+
+PULL_AUTHORS_KEY = 'timeline_pull_authors'
+# Поля порядка ленты подписок: дата и id поста из записи ленты
+FEED_FIELD = 'feed_date'
+FEED_TIEBREAK = 'feed_post'
+
+
+def get_pull_author_ids():
+    """Авторы, чьи посты не раскладываются по лентам, а читаются при показе.
+
+    Список берётся из счётчиков подписчиков и кешируется.
+    """
+    author_ids = cache.get(PULL_AUTHORS_KEY)
+    if author_ids is None:
+        author_ids = set(
+            UserStats.objects.filter(
+                followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(
+            PULL_AUTHORS_KEY, author_ids, settings.TIMELINE_PULL_CACHE_TIMEOUT
+        )
+    return author_ids
+
+
+def mark_pull_author(author_id):
+    """Сразу добавляет автора в список читаемых при показе"""
+    author_ids = get_pull_author_ids()
+    if author_id not in author_ids:
+        cache.set(
+            PULL_AUTHORS_KEY,
+            author_ids | {author_id},
+            settings.TIMELINE_PULL_CACHE_TIMEOUT,
+        )
+
+
+# Номер записи с конца ленты считается по возрастанию (дата, id), как
+# лежит индекс (user, pub_date): так окно обходится без сортировки
+TRIM_SQL = """
+DELETE FROM {table} WHERE id IN (
+    SELECT id FROM (
+        SELECT id, COUNT(*) OVER (
+            PARTITION BY user_id ORDER BY pub_date, post_id
+            ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING
+        ) AS position
+        FROM {table} WHERE user_id IN ({placeholders})
+    ) AS ranked WHERE position > %s
+)
+"""
+
+
+def trim(user_ids):
+    """Обрезает ленты пользователей до TIMELINE_LENGTH записей.
+
+    Одним запросом на всех: раскладка поста не платит за каждого
+    подписчика отдельным DELETE.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TRIM_SQL.format(
+                table=connection.ops.quote_name(TimelineEntry._meta.db_table),
+                placeholders=', '.join(['%s'] * len(user_ids)),
+            ),
+            [*user_ids, settings.TIMELINE_LENGTH],
+        )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Если подписчиков больше TIMELINE_FANOUT_LIMIT, пост не копируется,
+    а автор попадает в список читаемых при показе ленты.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    follower_ids = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id', flat=True
+        )[:limit + 1]
+    )
+    if len(follower_ids) > limit:
+        mark_pull_author(post.author_id)
+        return
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in follower_ids
+        ],
+        ignore_conflicts=True,
+    )
+    trim(follower_ids)
+
+
+def backfill(follow):
+    """Добавляет в ленту подписчика последние посты нового автора"""
+    if follow.author_id in get_pull_author_ids():
+        return
+    posts = Post.objects.filter(author_id=follow.author_id).values_list(
+        'pk', 'pub_date'
+    )[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follow.user_id, post_id=pk, pub_date=date)
+            for pk, date in posts
+        ],
+        ignore_conflicts=True,
+    )
+    trim([follow.user_id])
+
+
+def remove(follow):
+    """Убирает из ленты подписчика посты автора, от которого он отписался"""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id
+    ).delete()
+
+
+def get_follow_feed(user):
+    """Лента подписок: материализованная лента плюс посты «тяжёлых» авторов.
+
+    Упорядочена по FEED_FIELD и FEED_TIEBREAK. Без «тяжёлых» авторов это
+    столбцы записи ленты, и страница читается по индексу
+    timeline_user_pub_date_idx без сортировки.
+    """
+    posts = Post.objects.select_related('author', 'group')
+    pull_author_ids = get_pull_author_ids()
+    if pull_author_ids:
+        pull_author_ids = list(
+            Follow.objects.filter(
+                user=user, author_id__in=pull_author_ids
+            ).values_list('author_id', flat=True)
+        )
+    if not pull_author_ids:
+        posts = posts.filter(timeline_entries__user=user).annotate(**{
+            FEED_FIELD: F('timeline_entries__pub_date'),
+            FEED_TIEBREAK: F('timeline_entries__post'),
+        })
+    else:
+        posts = posts.filter(
+            Q(pk__in=TimelineEntry.objects.filter(user=user).values('post'))
+            | Q(author_id__in=pull_author_ids)
+        ).annotate(**{FEED_FIELD: F('pub_date'), FEED_TIEBREAK: F('pk')})
+    return posts.order_by(f'-{FEED_FIELD}', f'-{FEED_TIEBREAK}')
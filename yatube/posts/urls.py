@@ -17,6 +17,7 @@ urlpatterns = [
     path('create/', views.post_create, name='post_create'),
     path('', views.index, name='index'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
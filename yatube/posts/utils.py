@@ -1,11 +1,158 @@
+import base64
+import binascii
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 QUERY_LIMIT = 10  # Количесво страниц выводимых на одной странице
+PAGE_WINDOW = 2  # Номеров страниц по обе стороны от текущей в навигации
+PAGE_ENDS = 1  # Номеров страниц в начале и в конце навигации
+CURSOR_PARAM = 'cursor'  # GET-параметр курсорной пагинации
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(obj, direction, field='pub_date'):
+    """Непрозрачный курсор на позицию (дата, id) объекта"""
+    raw = f'{direction}|{getattr(obj, field).isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разбор курсора. Для битого курсора возвращает None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, value, pk = raw.decode().split('|')
+        position = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or position is None:
+        return None
+    return direction, position, pk
+
+
+class CursorPage:
+    """Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса Page, которой пользуются шаблоны,
+    но вместо номеров страниц отдаёт курсоры соседних страниц.
+    """
+    cursor_mode = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
 
+    def has_previous(self):
+        return self.previous_cursor is not None
 
-def get_page_paginator(queryset, request):
-    """Пагинация"""
-    paginator = Paginator(queryset, QUERY_LIMIT)
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def get_cursor_page(queryset, cursor=None, limit=QUERY_LIMIT,
+                    field='pub_date', tiebreak='pk'):
+    """Курсорная (keyset) пагинация по паре (field, id).
+
+    Вместо OFFSET и COUNT(*) выполняется один запрос с условием
+    «строго после курсора», который идёт по индексу на field
+    (в SQLite rowid уже входит в любой индекс), поэтому время ответа
+    не зависит от глубины страницы. tiebreak — поле с тем же значением,
+    что id объекта, из того же индекса, что field.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        direction = NEXT
+    else:
+        direction, value, pk = position
+    if direction == NEXT:
+        queryset = queryset.order_by(f'-{field}', f'-{tiebreak}')
+        if position is not None:
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value})
+                | Q(**{field: value, f'{tiebreak}__lt': pk})
+            )
+    else:
+        queryset = queryset.order_by(field, tiebreak).filter(
+            Q(**{f'{field}__gt': value})
+            | Q(**{field: value, f'{tiebreak}__gt': pk})
+        )
+    object_list = list(queryset[:limit + 1])
+    has_more = len(object_list) > limit
+    object_list = object_list[:limit]
+    if direction == PREVIOUS:
+        object_list.reverse()
+    if not object_list:
+        return CursorPage(object_list)
+    next_cursor = previous_cursor = None
+    if has_more or direction == PREVIOUS:
+        next_cursor = encode_cursor(object_list[-1], NEXT, field)
+    if position is not None and (has_more or direction == NEXT):
+        previous_cursor = encode_cursor(object_list[0], PREVIOUS, field)
+    return CursorPage(object_list, next_cursor, previous_cursor)
+
+
+def get_page_window(number, num_pages, on_each_side=PAGE_WINDOW,
+                    on_ends=PAGE_ENDS):
+    """Номера страниц для навигации: края и окно вокруг текущей.
+
+    Пропуски обозначены None: [1, None, 48, 49, 50, 51, 52, None, 10000].
+    Пропуск из одной страницы заменяется её номером.
+    """
+    pages = sorted(
+        {page for page in range(1, on_ends + 1) if page <= num_pages}
+        | set(range(max(number - on_each_side, 1),
+                    min(number + on_each_side, num_pages) + 1))
+        | set(range(max(num_pages - on_ends + 1, 1), num_pages + 1))
+    )
+    window = []
+    for page in pages:
+        if window and page - window[-1] == 2:
+            window.append(page - 1)
+        elif window and page - window[-1] > 2:
+            window.append(None)
+        window.append(page)
+    return window
+
+
+def add_page_window(page_obj):
+    """Окно номеров для шаблона вместо полного page_range"""
+    page_obj.page_window = get_page_window(
+        page_obj.number, page_obj.paginator.num_pages
+    )
+    return page_obj
+
+
+def get_page_paginator(queryset, request, per_page=QUERY_LIMIT,
+                       field='pub_date', tiebreak='pk'):
+    """Пагинация.
+
+    Курсорный режим включается настройкой CURSOR_PAGINATION
+    или наличием параметра cursor в запросе, курсор строится по field.
+    """
+    cursor = request.GET.get(CURSOR_PARAM)
+    if cursor is not None or settings.CURSOR_PAGINATION:
+        return get_cursor_page(queryset, cursor, per_page, field, tiebreak)
+    paginator = Paginator(queryset, per_page)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    return page_obj
+    return add_page_window(page_obj)
@@ -1,16 +1,27 @@
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, render, redirect
-from django.views.decorators.cache import cache_page
-
-from posts.utils import get_page_paginator
+from django.views.decorators.http import condition
+
+from core.cache import cache_page_versioned, condition_versioned
+from posts.freshness import (
+    group_scopes, index_scopes, post_etag, post_last_modified, profile_scopes
+)
+from posts.search import search_posts
+from posts.thumbnails import schedule_thumbnail
+from posts.timeline import FEED_FIELD, FEED_TIEBREAK, get_follow_feed
+from posts.utils import QUERY_LIMIT, add_page_window, get_page_paginator
 from posts.models import Group, Follow, Post, User
-from posts.forms import CommentForm, PostForm
+from posts.forms import CommentForm, PostForm, SearchForm
 
 
 WORD_LIMIT = 30  # Количество выводимых букв в заголовке профайла
+COMMENTS_LIMIT = 50  # Количество комментариев на странице поста
 
 
-@cache_page(20 * 1, key_prefix='index_page')
+@condition_versioned(index_scopes)
+@cache_page_versioned(index_scopes)
 def index(request):
     """Главная страница"""
     posts = Post.objects.select_related('group', 'author')
@@ -18,6 +29,8 @@ def index(request):
     return render(request, 'posts/index.html', {'page_obj': page_obj})
 
 
+@condition_versioned(group_scopes)
+@cache_page_versioned(group_scopes)
 def group_posts(request, slug):
     """Все посты выбранной группы"""
     group = get_object_or_404(Group, slug=slug)
@@ -30,9 +43,13 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@condition_versioned(profile_scopes)
+@cache_page_versioned(profile_scopes)
 def profile(request, username):
     """Профайл автора"""
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
     posts = author.posts.select_related('author',)
     following = (
         request.user.is_authenticated
@@ -49,20 +66,57 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, post_id):
     """Подробная информация выбранного поста"""
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
+    comments = get_page_paginator(
+        post.comments.select_related('author'),
+        request,
+        per_page=COMMENTS_LIMIT,
+        field='created',
+    )
     form = CommentForm(request.POST or None)
     title = f'Пост {post.text[:WORD_LIMIT]}'
     context = {
         'form': form,
         'post': post,
+        'comments': comments,
         'title': title,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    """Поиск по постам с фильтром по группе и автору"""
+    form = SearchForm(request.GET or None)
+    page_obj = None
+    if form.is_valid() and form.cleaned_data['q']:
+        posts = Post.objects.select_related('author', 'group')
+        if form.cleaned_data['group']:
+            posts = posts.filter(group=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            posts = posts.filter(author__username=form.cleaned_data['author'])
+        # Порядок задаёт релевантность, поэтому пагинация по номерам
+        paginator = Paginator(search_posts(form.cleaned_data['q'], posts),
+                              QUERY_LIMIT)
+        page_obj = add_page_window(
+            paginator.get_page(request.GET.get('page'))
+        )
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        'query_string': f'&{query.urlencode()}' if query else '',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
     """Создание новой записи"""
     form = PostForm(
@@ -74,6 +128,7 @@ def post_create(request):
         form = form.save(commit=False)
         form.author = request.user
         form.save()
+        schedule_thumbnail(form)
         return redirect('posts:profile', request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -92,8 +147,13 @@ def post_edit(request, post_id):
     is_edit = True
 
     if form.is_valid():
+        image_changed = 'image' in form.changed_data
         form = form.save(commit=False)
+        if image_changed:
+            form.thumbnail = form.image_variants = ''
         form.save()
+        if image_changed:
+            schedule_thumbnail(form)
         return redirect('posts:post_detail', post_id=post.pk)
 
     context = {
@@ -105,6 +165,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     """Добавление комментов"""
     post = get_object_or_404(Post, pk=post_id)
@@ -121,14 +182,15 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     """Все подписки"""
-    posts = Post.objects.filter(
-        author__following__user=request.user
-    ).select_related('author', 'group')
-    page_obj = get_page_paginator(posts, request)
+    posts = get_follow_feed(request.user)
+    page_obj = get_page_paginator(
+        posts, request, field=FEED_FIELD, tiebreak=FEED_TIEBREAK
+    )
     return render(request, 'posts/follow.html', {'page_obj': page_obj})
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     """Подписать на автора"""
     if request.user != get_object_or_404(User, username=username):
@@ -140,6 +202,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     """Отписаться от автора"""
     author = get_object_or_404(User, username=username)
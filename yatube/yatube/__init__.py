@@ -0,0 +1 @@
+from yatube import db  # noqa: F401
@@ -0,0 +1,106 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ROUTED_APPS = {'posts'}  # Приложения, которые читают с реплик
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class State(threading.local):
+    # Чтения идут только в основную базу. На реплики читают лишь
+    # запросы, которые PrimaryPinMiddleware не закрепил: команды и
+    # фоновые потоки сразу читают то, что записали
+    pinned = True
+    wrote = False  # Запрос записал данные приложений ROUTED_APPS
+
+
+state = State()
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока идут в основную базу"""
+    pinned, state.pinned = state.pinned, True
+    try:
+        yield
+    finally:
+        state.pinned = pinned
+
+
+@contextmanager
+def primary_after_write(changed_at):
+    """Основная база, если данные менялись недавно.
+
+    changed_at — время последнего изменения данных (time.time()).
+    Меньше REPLICA_PIN_SECONDS после него реплика может отставать, и
+    собранная по ней страница застряла бы в кеше под новым поколением.
+    Запрос, который сам записал данные, тоже читает с основной базы.
+    """
+    recent = time.time() - changed_at < settings.REPLICA_PIN_SECONDS
+    if state.wrote or recent:
+        with use_primary():
+            yield
+    else:
+        yield
+
+
+class PrimaryReplicaRouter:
+    """Чтения постов идут на реплики, запись — в основную базу.
+
+    Реплики перечислены в DATABASE_REPLICAS. Без них роутер не
+    вмешивается, и всё работает с default. Вне запроса чтения тоже идут
+    в основную базу.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or state.pinned
+                or model._meta.app_label not in ROUTED_APPS):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in ROUTED_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет за клиентом основную базу после его записи.
+
+    Изменяющие запросы читают с основной базы. Если запрос записал
+    посты, комментарии или подписки, клиент получает cookie на
+    REPLICA_PIN_SECONDS, и следующие его запросы тоже читают с основной
+    базы: автор сразу видит свой пост, пока реплика догоняет.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state.pinned = (
+            request.method not in SAFE_METHODS
+            or PIN_COOKIE in request.COOKIES
+        )
+        state.wrote = False
+        try:
+            response = self.get_response(request)
+            if state.wrote:
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            state.pinned, state.wrote = True, False
+        return response
@@ -25,34 +25,61 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.profiler.ProfilerMiddleware',
+    'core.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.routers.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки только для разработки: в боевом режиме она не нужна,
+# а её middleware всё равно обрабатывал бы каждый запрос
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Заголовок Server-Timing выдаёт устройство запроса, поэтому по умолчанию
+# его получают только DEBUG, INTERNAL_IPS и сотрудники
+SERVER_TIMING_PUBLIC = False
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Кеширующий загрузчик разбирает шаблон один раз за жизнь процесса,
+# а TEMPLATE_WARMUP разбирает все шаблоны проекта при старте
+# (core/template_warmup.py). В режиме отладки шаблоны читаются заново.
+TEMPLATE_WARMUP = os.environ.get(
+    'YATUBE_TEMPLATE_WARMUP', '0' if DEBUG else '1'
+) == '1'
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени шаблонов для Server-Timing
+        'BACKEND': 'core.instrumentation.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -73,6 +100,31 @@ DATABASES = {
     },
 }
 
+# Реплика для чтения постов (yatube/routers.py). Локально это второй
+# файл SQLite, который догоняет основной копией:
+#   sqlite3 db.sqlite3 ".backup replica.sqlite3"
+# В тестах реплика — зеркало default.
+if os.environ.get('YATUBE_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['YATUBE_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['yatube.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы
+REPLICA_PIN_SECONDS = 5
+
+# Выполняются по порядку при каждом подключении к SQLite (yatube/db.py),
+# значение None отключает PRAGMA
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,  # Мс ожидания блокировки, в том числе для PRAGMA ниже
+    'journal_mode': 'wal',  # Читатели не блокируются писателем
+    'synchronous': 'normal',  # В режиме WAL безопасно и без fsync на коммит
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # Отрицательное значение — в килобайтах
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -126,4 +178,102 @@ CACHES = {
     },
 }
 
+# Страницы лент живут в кеше до сигнала об изменении, таймаут лишь
+# ограничивает срок жизни. Сигналы видны другим процессам только при
+# общем бэкенде кеша (memcached, redis, файловый).
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Карточки постов: ключ включает post.updated, поэтому правка поста
+# сама даёт новый ключ, а таймаут только освобождает память
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Защита от лавины пересборок: устаревшая копия отдаётся ещё
+# CACHE_STALE_TTL секунд, пока один процесс собирает новую под блокировкой
+CACHE_STALE_TTL = 60 * 10
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 2
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+# Курсорная пагинация лент вместо постраничной (без COUNT и OFFSET)
+CURSOR_PAGINATION = False
+
+# Материализованная лента подписок
+TIMELINE_LENGTH = 1000  # Сколько постов хранится в ленте одного читателя
+TIMELINE_FANOUT_LIMIT = 1000  # Авторов с большим числом подписчиков читаем при показе
+TIMELINE_PULL_CACHE_TIMEOUT = 60 * 5
+
+# Миниатюры строятся в фоновом пуле потоков после сохранения поста.
+# В тестах синхронно (yatube/settings_test.py): потоки не должны писать
+# во временный MEDIA_ROOT после того, как тест его удалил.
+THUMBNAIL_ASYNC = os.environ.get('YATUBE_THUMBNAIL_ASYNC', '1') == '1'
+THUMBNAIL_WORKERS = 2
+
+# Картинки без постов удаляет python manage.py sweep_images (по cron).
+# Файлы моложе IMAGE_SWEEP_GRACE секунд не трогаются: их пост может быть
+# ещё не записан
+IMAGE_SWEEP_GRACE = 60 * 60
+
+# Метрики /metrics (core/metrics.py). С несколькими процессами укажите
+# общий каталог: каждый процесс пишет туда свой файл, ответ их складывает
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+# /metrics открыт только этим адресам и запросам с заголовком
+# Authorization: Bearer <YATUBE_METRICS_TOKEN>
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
+
+# Профили медленных запросов (core/profiler.py), по умолчанию выключены.
+# Профилируется доля PROFILER_SAMPLE_RATE запросов, сохраняются профили
+# тех, что дольше PROFILER_THRESHOLD секунд. Свести их в flamegraph:
+#   python manage.py aggregate_profiles --view posts:post_detail
+PROFILER_SAMPLE_RATE = float(os.environ.get('YATUBE_PROFILE_RATE', 0))
+PROFILER_THRESHOLD = 0.5
+PROFILER_MODE = 'sampling'  # или 'cprofile'
+PROFILER_INTERVAL = 0.005  # Период снимков стека в режиме sampling
+PROFILER_VIEWS = []  # Например ['posts:post_detail'], пусто — все
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+
+# Журнал медленных запросов к базе (core/slow_queries.py): строки JSON
+# с планом запроса. Сводка по отпечаткам:
+#   python manage.py slow_query_report
+# Порог в секундах, пустое значение выключает журнал.
+SLOW_QUERY_THRESHOLD = os.environ.get('YATUBE_SLOW_QUERY_THRESHOLD', '0.1')
+SLOW_QUERY_THRESHOLD = (
+    float(SLOW_QUERY_THRESHOLD) if SLOW_QUERY_THRESHOLD else None
+)
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+# Строки о запросах от core.instrumentation.ServerTimingMiddleware
+REQUEST_LOG_LEVEL = os.environ.get('YATUBE_REQUEST_LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(name)s %(message)s'},
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'yatube.requests': {
+            'handlers': ['console'],
+            'level': REQUEST_LOG_LEVEL,
+            'propagate': False,
+        },
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
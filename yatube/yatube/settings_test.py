@@ -0,0 +1,18 @@
+"""Настройки тестов: python manage.py test и pytest (pytest.ini)"""
+import atexit
+import shutil
+import tempfile
+
+from yatube.settings import *  # noqa: F401,F403
+from yatube.settings import LOGGING
+
+# Загрузки тестов не попадают в media/ рабочей копии
+MEDIA_ROOT = tempfile.mkdtemp(prefix='yatube-media-')
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+# Миниатюры синхронно: потоки не пишут во временный MEDIA_ROOT,
+# который тест уже удалил
+THUMBNAIL_ASYNC = False
+TEMPLATE_WARMUP = False
+SLOW_QUERY_THRESHOLD = None
+LOGGING['loggers']['yatube.requests']['level'] = 'WARNING'